@@ -0,0 +1,11 @@
+"""
+Configuration pytest: les tests importent model, controller... comme main.py.
+
+client/ est ajouté au chemin d'import pour que la suite tourne aussi depuis
+la racine du dépôt (python -m pytest).
+"""
+
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
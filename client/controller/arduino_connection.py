@@ -0,0 +1,336 @@
+"""
+Connexion TCP persistante vers l'Arduino.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import Future
+from dataclasses import dataclass
+import queue
+import socket
+import threading
+import time
+from typing import Callable, Optional
+
+
+class ArduinoConnectionError(Exception):
+    """Erreur de communication avec l'Arduino."""
+
+
+@dataclass
+class FramedResponse:
+    """Contenu d'une réponse tramée et sa position absolue côté Arduino.
+
+    Les positions comptent des octets: payload est gardé tel que reçu, data
+    n'en est que le décodage (caractères invalides ignorés). base est la position absolue du début du journal de l'Arduino (None si
+    le firmware ne l'envoie pas): elle ne diminue jamais, sauf si le journal
+    a recommencé à zéro (logbase.txt perdu).
+    """
+
+    payload: bytes
+    offset: int = 0
+    base: Optional[int] = None
+
+    @property
+    def data(self) -> str:
+        return self.payload.decode("ascii", errors="ignore")
+
+    @property
+    def end_offset(self) -> int:
+        return self.offset + len(self.payload)
+
+
+class ArduinoConnection:
+    """Session TCP unique vers l'Arduino, partagée par toutes les commandes.
+
+    Les commandes sont mises en file (bornée à max_pending) et exécutées dans
+    l'ordre par un thread dédié; une commande identique à une commande encore
+    en attente n'est pas dupliquée. Les commandes déjà en attente sont
+    envoyées d'un bloc (pipelining)
+    puis les réponses (terminées par une ligne "OK") sont lues dans l'ordre.
+    En cas de coupure, la connexion est rétablie avec un délai exponentiel;
+    une commande déjà envoyée n'est renvoyée que si elle est sans effet en
+    double (test, "l", "p"): un chargement ou une ouverture échoue plutôt
+    que d'être exécuté deux fois.
+
+    Une commande est une chaîne ASCII, ou des octets envoyés tels quels
+    (trame binaire de chargement "B"), toujours suivis du point final.
+
+    Les réponses volumineuses (logs) sont tramées: une ligne
+    "L<octets>[@<position>[/<début>]]" annonce la taille exacte du contenu
+    (et sa position absolue, ainsi que celle du début du journal), suivi de
+    la ligne "OK".
+    """
+
+    MAX_PIPELINE = 8
+    RECV_CHUNK = 4096
+
+    def __init__(
+        self,
+        ip: str,
+        port: int,
+        connect_timeout: float = 2.0,
+        min_backoff: float = 1.0,
+        max_backoff: float = 30.0,
+        max_pending: int = 32,
+    ):
+        self.ip = ip
+        self.port = port
+        self.connect_timeout = connect_timeout
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+
+        self._sock: Optional[socket.socket] = None
+        self._rx = bytearray()
+        # Nombre de sessions ouvertes (change à chaque reconnexion)
+        self.connections = 0
+        self._backoff = 0.0
+        self._next_attempt = 0.0
+
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        # Commandes en file non encore envoyées: (message, framed) -> Future
+        self._pending: dict[tuple[str | bytes, bool], Future] = {}
+        self._pending_lock = threading.Lock()
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    @property
+    def address(self) -> tuple[str, int]:
+        return (self.ip, self.port)
+
+    @property
+    def is_connected(self) -> bool:
+        return self._sock is not None
+
+    # ------------------------------------------------------------------
+    # API publique
+    # ------------------------------------------------------------------
+    def submit(
+        self,
+        message: str | bytes,
+        timeout: float = 5.0,
+        callback: Optional[Callable[[bool, str], None]] = None,
+        framed: bool = False,
+    ) -> Future:
+        """Met une commande en file et retourne un Future (success, response).
+
+        Le point final est ajouté automatiquement. Si la même commande est
+        déjà en attente, son Future est retourné. Si la file est pleine, le
+        Future est aussitôt en échec. Le callback éventuel est appelé depuis
+        le thread de la connexion. Avec framed=True, la réponse doit être
+        précédée de sa taille ("L<octets>"), n'est acceptée que si elle est
+        complète et est retournée sous forme de FramedResponse.
+        """
+        key = (message, framed)
+        with self._pending_lock:
+            future = self._pending.get(key)
+            if future is None:
+                future = Future()
+                if self._closed:
+                    future.set_result((False, "Erreur: connexion Arduino fermée"))
+                else:
+                    try:
+                        self._queue.put_nowait((message, timeout, framed, future))
+                        self._pending[key] = future
+                    except queue.Full:
+                        future.set_result((False, "Erreur: trop de commandes en attente"))
+        if callback is not None:
+            future.add_done_callback(lambda f: callback(*f.result()))
+        return future
+
+    def request(
+        self, message: str | bytes, timeout: float = 5.0, framed: bool = False
+    ) -> tuple[bool, str | FramedResponse]:
+        """Envoie une commande et attend sa réponse (bloquant).
+
+        La réponse est une FramedResponse si framed=True et que la commande
+        a réussi, un message (str) sinon.
+        """
+        return self.submit(message, timeout, framed=framed).result()
+
+    def ping(self, timeout: float = 2.0) -> bool:
+        """Vérifie la connexion en envoyant une commande vide sur la session.
+
+        Tant que le délai de reconnexion n'est pas écoulé, retourne False
+        sans solliciter l'Arduino.
+        """
+        if self._sock is None and time.monotonic() < self._next_attempt:
+            return False
+        success, _ = self.request("", timeout)
+        return success
+
+    def close(self):
+        """Ferme la session et arrête le thread de la connexion."""
+        with self._pending_lock:
+            self._closed = True
+        try:
+            self._queue.put_nowait(None)
+        except queue.Full:
+            # Le thread vérifie _closed après chaque envoi
+            pass
+
+    # ------------------------------------------------------------------
+    # Thread de la connexion
+    # ------------------------------------------------------------------
+    def _run(self):
+        while not self._closed:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            while len(batch) < self.MAX_PIPELINE:
+                try:
+                    extra = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if extra is None:
+                    break
+                batch.append(extra)
+            # Les commandes sorties de la file ne sont plus dédupliquées
+            with self._pending_lock:
+                for message, _, framed, future in batch:
+                    if self._pending.get((message, framed)) is future:
+                        del self._pending[(message, framed)]
+            self._execute(batch)
+
+        self._disconnect()
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                item[-1].set_result((False, "Erreur: connexion Arduino fermée"))
+
+    def _execute(self, batch: list):
+        # Une session restée inactive a pu être fermée par l'Arduino: si
+        # aucune réponse n'a été reçue, la file est renvoyée une seule fois,
+        # à condition que l'Arduino n'ait pas pu l'exécuter (échec de
+        # l'envoi) ou qu'une seconde exécution soit sans effet (lectures).
+        pending = list(batch)
+        for attempt in range(2):
+            was_connected = self._sock is not None
+            sent = False
+            try:
+                self._connect()
+                self._sock.sendall(b"".join(_encode(message) for message, _, _, _ in pending))
+                sent = True
+                while pending:
+                    _, timeout, framed, future = pending[0]
+                    if framed:
+                        response = self._read_framed_response(timeout)
+                    else:
+                        response = self._read_response(timeout)
+                    pending.pop(0)
+                    future.set_result((True, response))
+                return
+            except socket.timeout:
+                error = "Timeout: pas de réponse de l'Arduino"
+                self._disconnect()
+                break
+            except (ArduinoConnectionError, OSError) as e:
+                error = f"Erreur de socket: {e}"
+                self._disconnect()
+                if not was_connected or len(pending) < len(batch) or attempt > 0:
+                    break
+                if sent and not all(_is_idempotent(message) for message, _, _, _ in pending):
+                    break
+            except Exception as e:
+                error = f"Erreur inattendue: {e}"
+                self._disconnect()
+                break
+
+        for _, _, _, future in pending:
+            future.set_result((False, error))
+
+    def _connect(self):
+        if self._sock is not None:
+            return
+        now = time.monotonic()
+        try:
+            sock = socket.create_connection(self.address, timeout=self.connect_timeout)
+        except OSError:
+            self._backoff = min(max(self._backoff * 2, self.min_backoff), self.max_backoff)
+            self._next_attempt = now + self._backoff
+            raise
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._sock = sock
+        self.connections += 1
+        self._rx.clear()
+        self._backoff = 0.0
+        self._next_attempt = 0.0
+
+    def _disconnect(self):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = None
+        self._rx.clear()
+
+    def _read_line(self) -> bytes:
+        while True:
+            index = self._rx.find(b"\n")
+            if index >= 0:
+                line = bytes(self._rx[:index]).rstrip(b"\r")
+                del self._rx[:index + 1]
+                return line
+            self._recv_into_buffer()
+
+    def _recv_into_buffer(self):
+        chunk = self._sock.recv(self.RECV_CHUNK)
+        if not chunk:
+            raise ArduinoConnectionError("connexion fermée par l'Arduino")
+        self._rx += chunk
+
+    def _read_response(self, timeout: float) -> str:
+        """Lit une réponse complète (lignes jusqu'à la ligne "OK")."""
+        self._sock.settimeout(timeout)
+        lines = []
+        while True:
+            line = self._read_line()
+            if line == b"OK":
+                return "\n".join(lines)
+            lines.append(line.decode("ascii", errors="ignore"))
+
+    def _read_framed_response(self, timeout: float) -> FramedResponse:
+        """Lit une réponse tramée "L<octets>[@<position>[/<début>]]", contenu, puis "OK".
+
+        Le contenu est gardé en octets; une réponse tronquée ou mal formée
+        lève ArduinoConnectionError.
+        """
+        self._sock.settimeout(timeout)
+        header = self._read_line()
+        size, _, offset = header[1:].partition(b"@")
+        offset, _, base = offset.partition(b"/")
+        if (
+            not header.startswith(b"L")
+            or not size.isdigit()
+            or not (offset or b"0").isdigit()
+            or not (base or b"0").isdigit()
+        ):
+            raise ArduinoConnectionError(f"en-tête de réponse invalide: {header[:32]!r}")
+        remaining = int(size)
+
+        while len(self._rx) < remaining:
+            self._recv_into_buffer()
+        payload = bytes(self._rx[:remaining])
+        del self._rx[:remaining]
+
+        if self._read_line() != b"OK":
+            raise ArduinoConnectionError("fin de réponse manquante")
+        return FramedResponse(payload, int(offset or 0), int(base) if base else None)
+
+
+def _is_idempotent(message: str | bytes) -> bool:
+    """Commande sans effet si l'Arduino l'exécute deux fois (test, "l", "p")."""
+    return isinstance(message, str) and message[:1] in ("", "l", "p")
+
+
+def _encode(message: str | bytes) -> bytes:
+    """Commande telle qu'envoyée sur le socket, point final compris."""
+    if isinstance(message, str):
+        message = message.encode("ascii")
+    return message + b"."
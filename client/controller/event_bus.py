@@ -0,0 +1,79 @@
+"""
+Bus d'événements entre le cœur de l'application et ses interfaces.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+from typing import Callable
+
+
+# Événements publiés par LockerCore (arguments entre parenthèses)
+BOXES_CHANGED = "boxes_changed"    # (ids des boîtes modifiées)
+LOG = "log"                        # (message)
+BADGE_LOGS = "badge_logs"          # (liste de (datetime, nom_client))
+ARDUINO_STATUS = "arduino_status"  # (connecté: bool)
+ERROR = "error"                    # (message à montrer à l'utilisateur)
+
+
+class EventBus:
+    """Abonnements par nom d'événement.
+
+    publish() appelle les abonnés dans le thread appelant: LockerCore ne
+    publie que depuis le thread propriétaire du modèle (thread Tk, ou
+    EventLoop en mode sans interface).
+    """
+
+    def __init__(self):
+        self._subscribers: dict[str, list[Callable]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, event: str, callback: Callable):
+        with self._lock:
+            self._subscribers.setdefault(event, []).append(callback)
+
+    def unsubscribe(self, event: str, callback: Callable):
+        with self._lock:
+            callbacks = self._subscribers.get(event, [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+
+    def publish(self, event: str, *args):
+        with self._lock:
+            callbacks = list(self._subscribers.get(event, ()))
+        for callback in callbacks:
+            try:
+                callback(*args)
+            except Exception as e:
+                print(f"Erreur dans un abonné à '{event}': {e}")
+
+
+class EventLoop:
+    """Thread propriétaire du modèle en mode sans interface.
+
+    Équivalent de root.after(0, ...): call_soon() peut être appelé depuis
+    n'importe quel thread, les tâches sont exécutées dans l'ordre par le
+    thread qui appelle run().
+    """
+
+    def __init__(self):
+        self._tasks: queue.Queue = queue.Queue()
+
+    def call_soon(self, callback: Callable, *args):
+        self._tasks.put((callback, args))
+
+    def run(self):
+        """Exécute les tâches jusqu'à stop()."""
+        while True:
+            task = self._tasks.get()
+            if task is None:
+                break
+            callback, args = task
+            try:
+                callback(*args)
+            except Exception as e:
+                print(f"Erreur dans une tâche: {e}")
+
+    def stop(self):
+        self._tasks.put(None)
@@ -0,0 +1,119 @@
+"""
+Mode flotte: plusieurs casiers gérés par un même client.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+from pathlib import Path
+from typing import Callable, Optional
+
+from model.config import ConfigStore, LockerConfigStore, get_config_store
+from model.log_store import LogStore
+from model.placement import split_orders
+from model.users import Badgelist
+from controller.event_bus import LOG
+from controller.locker_core import LockerCore
+from controller.order_loader import OrderLoader
+
+
+def _locker_dir_name(name: str) -> str:
+    """Nom de dossier sûr pour les logs d'un casier."""
+    return "".join(char if char.isalnum() or char in "-_" else "_" for char in name)
+
+
+class FleetCore:
+    """Un LockerCore par casier, avec un chargement des commandes commun.
+
+    Sans section [nom] dans config.txt, la flotte contient un seul casier
+    configuré comme avant (config.txt, logs/). Sinon chaque casier a sa
+    configuration, son modèle, sa file de commandes Arduino et ses logs
+    (logs/<nom>/, curseur compris); chaque casier est surveillé par son
+    propre thread, si bien qu'un casier lent ne retarde pas les autres.
+
+    Les commandes du jour sont téléchargées une fois puis réparties entre
+    les casiers selon leur capacité (split_orders).
+    """
+
+    def __init__(
+        self,
+        call_soon: Callable[..., None],
+        config_store: Optional[ConfigStore] = None,
+        logs_dir: Optional[Path] = None,
+    ):
+        self.call_soon = call_soon
+        self.config_store = config_store or get_config_store()
+        config = self.config_store.get()
+
+        self.is_fleet = config.is_fleet
+        if not self.is_fleet:
+            self.cores = [LockerCore(call_soon, config_store=self.config_store, num_boxes=config.num_boxes)]
+        else:
+            if logs_dir is None:
+                logs_dir = Path(__file__).resolve().parents[2] / "logs"
+            badge_list = Badgelist()
+            self.cores = []
+            for locker in config.lockers:
+                locker_dir = Path(logs_dir) / _locker_dir_name(locker.name)
+                self.cores.append(LockerCore(
+                    call_soon,
+                    config_store=LockerConfigStore(self.config_store, locker.name),
+                    badge_list=badge_list,
+                    log_store=LogStore(locker_dir),
+                    log_cursor_path=locker_dir / "arduino_cursor.txt",
+                    num_boxes=locker.num_boxes,
+                    name=locker.name,
+                ))
+
+        # Chargement commun des commandes (sans flotte: celui du casier)
+        self._order_loader: Optional[OrderLoader] = None
+        if self.is_fleet:
+            self._order_loader = OrderLoader(
+                call_soon, lambda message: self.cores[0].events.publish(LOG, message)
+            )
+
+    def start(self):
+        for core in self.cores:
+            core.start()
+
+    def stop(self):
+        if self._order_loader is not None:
+            self._order_loader.shutdown()
+        for core in self.cores:
+            core.stop()
+
+    def load_orders(self, day: date):
+        """
+        Lance le chargement des commandes d'une date pour tous les casiers.
+
+        Comme LockerCore.load_orders, mais le fichier est lu une seule fois
+        et les commandes sont réparties selon la capacité de chaque casier.
+        """
+        if not self.is_fleet:
+            self.cores[0].load_orders(day)
+            return
+
+        for core in self.cores:
+            core.current_date = day
+
+        # Boîtes libres relevées ici: le placement ne lit pas les modèles
+        layouts = [core.model.free_layout() for core in self.cores]
+
+        def _stage(orders):
+            # Une place par pain, deux par boîte double
+            shares = split_orders(orders, [sum(box.size for box in layout) for layout in layouts])
+            staged = [
+                core.model.stage_orders(share, layout)
+                for core, share, layout in zip(self.cores, shares, layouts)
+            ]
+            for core in self.cores:
+                # Préchauffe le cache des logs utilisé par la synchronisation
+                core.load_logs_for_date(day)
+            return staged
+
+        self._order_loader.load(day, self.config_store.get(), _stage, self._commit_orders)
+
+    def _commit_orders(self, staged_loads: list):
+        """Applique dans chaque casier un chargement préparé par load_orders."""
+        for core, staged in zip(self.cores, staged_loads):
+            core.apply_load(staged)
@@ -0,0 +1,77 @@
+"""
+Surveillance de la connexion Arduino à intervalle adaptatif.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Callable
+
+from model.config import AppConfig
+
+
+class HealthMonitor:
+    """Vérifie périodiquement l'Arduino dans un thread dédié.
+
+    L'intervalle s'adapte à la situation: poll_fast tant que des boîtes
+    chargées attendent leur client, poll_slow sinon. Si l'Arduino ne répond
+    pas, l'intervalle double à chaque échec jusqu'à poll_max_backoff, sans
+    jamais être plus court que l'intervalle normal.
+
+    L'attente se fait sur un Event: wake() déclenche une vérification
+    immédiate et stop() interrompt le thread sans attendre la fin du délai.
+    """
+
+    def __init__(
+        self,
+        probe: Callable[[], bool],
+        is_busy: Callable[[], bool],
+        get_config: Callable[[], AppConfig],
+    ):
+        self._probe = probe
+        self._is_busy = is_busy
+        self._get_config = get_config
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="arduino-health", daemon=True)
+        self._thread.start()
+
+    def wake(self):
+        """Déclenche une vérification immédiate."""
+        self._wake.set()
+
+    def stop(self, timeout: float = 1.0):
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    @staticmethod
+    def next_interval(config: AppConfig, busy: bool, failures: int) -> float:
+        """Délai avant la prochaine vérification (en secondes)."""
+        base = config.poll_fast if busy else config.poll_slow
+        if failures > 0:
+            delay = config.poll_fast * (2 ** min(failures - 1, 16))
+            return min(max(base, delay), config.poll_max_backoff)
+        return base
+
+    def _run(self):
+        failures = 0
+        while not self._stopped.is_set():
+            try:
+                connected = self._probe()
+            except Exception as e:
+                print(f"Erreur lors de la vérification Arduino: {e}")
+                connected = False
+            failures = 0 if connected else failures + 1
+
+            delay = self.next_interval(self._get_config(), self._is_busy(), failures)
+            self._wake.wait(delay)
+            self._wake.clear()
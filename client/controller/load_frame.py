@@ -0,0 +1,43 @@
+"""
+Trame binaire de chargement des casiers (commande "B" de p1s_arduino.ino).
+"""
+
+from __future__ import annotations
+
+import struct
+import zlib
+
+
+FRAME_START = b"B"
+_COUNT = struct.Struct("<H")
+_RECORD = struct.Struct("<II")
+_CHECKSUM = struct.Struct("<I")
+
+
+def encode_load_frame(tags: list[tuple[int, int]]) -> bytes:
+    """Trame "B" pour une liste de (badge principal, badge secondaire).
+
+    Format (little-endian): nombre de casiers (uint16), puis pour chaque
+    casier les deux badges (uint32, 0 si aucun), puis le CRC-32 de ce qui
+    suit "B". Le point final est ajouté par ArduinoConnection.
+    """
+    body = _COUNT.pack(len(tags)) + b"".join(_RECORD.pack(primary, secondary) for primary, secondary in tags)
+    return FRAME_START + body + _CHECKSUM.pack(zlib.crc32(body))
+
+
+def frame_size(count: int) -> int:
+    """Taille d'une trame de count casiers, "B" compris (sans le point final)."""
+    return len(FRAME_START) + _COUNT.size + count * _RECORD.size + _CHECKSUM.size
+
+
+def decode_load_frame(frame: bytes) -> list[tuple[int, int]]:
+    """Inverse de encode_load_frame; lève ValueError si la trame est invalide."""
+    if not frame.startswith(FRAME_START) or len(frame) < frame_size(0):
+        raise ValueError("trame incomplète")
+    body, checksum = frame[len(FRAME_START):-_CHECKSUM.size], frame[-_CHECKSUM.size:]
+    (count,) = _COUNT.unpack_from(body)
+    if len(frame) != frame_size(count):
+        raise ValueError("taille de trame invalide")
+    if zlib.crc32(body) != _CHECKSUM.unpack(checksum)[0]:
+        raise ValueError("somme de contrôle invalide")
+    return list(_RECORD.iter_unpack(body[_COUNT.size:]))
@@ -0,0 +1,598 @@
+"""
+Cœur de l'application, indépendant de l'interface graphique.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import Future
+from datetime import date, datetime, timedelta
+from pathlib import Path
+import threading
+from typing import Callable, Optional
+
+from model.bread_box_model import BreadBoxModel, BoxStatus, StagedLoad
+from model.config import AppConfig, ConfigStore, get_config_store
+from model.log_store import LogStore
+from model.users import Badgelist
+from controller.arduino_connection import ArduinoConnection
+from controller.event_bus import ARDUINO_STATUS, BADGE_LOGS, BOXES_CHANGED, ERROR, LOG, EventBus
+from controller.health_monitor import HealthMonitor
+from controller.load_frame import encode_load_frame
+from controller.order_loader import OrderLoader
+from controller.push_listener import PushListener
+
+
+class LockerCore:
+    """Chargement des commandes, synchronisation des logs et communication Arduino.
+
+    Le modèle appartient à un seul thread (thread Tk, ou EventLoop en mode
+    sans interface): les travaux en arrière-plan y reviennent par
+    call_soon, et les événements (event_bus) sont publiés depuis ce thread.
+    """
+
+    def __init__(
+        self,
+        call_soon: Callable[..., None],
+        config_store: Optional[ConfigStore] = None,
+        badge_list: Optional[Badgelist] = None,
+        log_store: Optional[LogStore] = None,
+        log_cursor_path: Optional[Path] = None,
+        num_boxes: int = 28,
+        name: str = "",
+    ):
+        self.name = name
+        self.call_soon = call_soon
+        self.events = EventBus()
+
+        # Configuration partagée (config.txt relu seulement s'il change)
+        self.config_store = config_store or get_config_store()
+
+        self.model = BreadBoxModel(num_boxes=num_boxes, config_store=self.config_store)
+        self.badge_list = badge_list or Badgelist()
+        self.log_store = log_store or LogStore()
+        if log_cursor_path is None:
+            log_cursor_path = Path(__file__).resolve().parents[2] / "logs" / "arduino_cursor.txt"
+        self.log_cursor_path = Path(log_cursor_path)
+
+        # Date des commandes affichées (et des logs utilisés pour les statuts)
+        self.current_date: date = date.today()
+
+        self.model.register_observer(
+            lambda changed_ids: self.events.publish(BOXES_CHANGED, changed_ids)
+        )
+        # Boîte réservée actuellement appliquée au modèle (boxnumber)
+        self._reserved_box_id: Optional[int] = None
+        self.apply_reserved_box()
+        self.config_store.register_observer(self._on_config_changed)
+
+        # Chargement des commandes en arrière-plan, créé au premier
+        # load_orders (jamais dans une flotte: FleetCore charge pour tous)
+        self._order_loader: Optional[OrderLoader] = None
+
+        # Session TCP persistante vers l'Arduino (créée à la demande)
+        self._arduino: Optional[ArduinoConnection] = None
+        self._arduino_lock = threading.Lock()
+
+        # Curseur des logs Arduino partagé par la récupération ("l") et les
+        # badges reçus en direct (push UDP)
+        self._log_lock = threading.Lock()
+        self._push_listener: Optional[PushListener] = None
+        # Dernier abonnement annoncé: (connexion, numéro de session, port)
+        self._push_subscription: Optional[tuple] = None
+
+        # Vérification Arduino à intervalle adaptatif
+        self._health_monitor = HealthMonitor(
+            probe=self._check_arduino_status,
+            is_busy=self.model.has_pending_retrievals,
+            get_config=self.config_store.get,
+        )
+
+    def start(self):
+        """Démarre la surveillance de l'Arduino."""
+        self._health_monitor.start()
+
+    def stop(self):
+        """Arrête proprement les threads et la session Arduino."""
+        self._health_monitor.stop()
+        if self._push_listener is not None:
+            self._push_listener.stop()
+        if self._order_loader is not None:
+            self._order_loader.shutdown()
+        with self._arduino_lock:
+            if self._arduino is not None:
+                self._arduino.close()
+                self._arduino = None
+
+    def _publish_soon(self, event: str, *args):
+        """Publie un événement depuis le thread propriétaire du modèle."""
+        self.call_soon(self.events.publish, event, *args)
+
+    # ------------------------------------------------------------------
+    # Commandes de pains
+    # ------------------------------------------------------------------
+    def load_orders(self, day: date):
+        """
+        Lance le chargement des commandes d'une date.
+
+        Le téléchargement, le parsing et le placement sont faits en
+        arrière-plan sur un modèle préparé (StagedLoad); le résultat est
+        appliqué dans le thread propriétaire avec une seule notification.
+        Un chargement remplacé par une sélection plus récente est abandonné.
+        """
+        self.current_date = day
+
+        # Boîtes libres relevées ici: le placement ne lit pas le modèle
+        layout = self.model.free_layout()
+
+        def _stage(orders):
+            staged = self.model.stage_orders(orders, layout)
+            # Préchauffe le cache des logs utilisé par la synchronisation
+            self.load_logs_for_date(day)
+            return staged
+
+        if self._order_loader is None:
+            self._order_loader = OrderLoader(
+                self.call_soon, lambda message: self.events.publish(LOG, message)
+            )
+        self._order_loader.load(day, self.config_store.get(), _stage, self.apply_load)
+
+    def apply_load(self, staged: StagedLoad):
+        """Applique un placement préparé et le synchronise avec les logs."""
+        # Chargement et synchronisation: un seul rafraîchissement de la grille
+        with self.model.batch():
+            unplaced = self.model.apply_staged(staged)
+
+            # Synchroniser avec les logs - statut de base OCCUPIED (orange)
+            self.sync_boxes_status_with_logs(base_status=BoxStatus.OCCUPIED)
+
+        for order in unplaced:
+            self.events.publish(
+                LOG, f"Pas de case disponible: {order.user} - {order.bread} x{order.qty}"
+            )
+
+    def apply_reserved_box(self, config: Optional[AppConfig] = None):
+        """Réserve la boîte boxnumber (l'ancienne boîte réservée redevient vide)."""
+        box_id = (config or self.config_store.get()).reserved_box_id
+        if box_id is not None and not (0 <= box_id < self.model.num_boxes):
+            box_id = None
+
+        with self.model.batch():
+            previous = self._reserved_box_id
+            if previous is not None and previous != box_id:
+                box = self.model.get_box(previous)
+                if box and box.status == BoxStatus.RESERVED:
+                    self.model.update_box_status(previous, BoxStatus.EMPTY)
+            self._reserved_box_id = box_id
+            if box_id is not None:
+                self.model.reserve_box(box_id)
+
+    def _on_config_changed(self, config: AppConfig):
+        """Callback appelé (depuis n'importe quel thread) quand config.txt change"""
+        self.call_soon(self._apply_config, config)
+
+    def _apply_config(self, config: AppConfig):
+        """Applique config.txt au modèle (thread propriétaire, une notification)."""
+        with self.model.batch():
+            self.model.apply_config(config)
+            self.apply_reserved_box(config)
+
+    # ------------------------------------------------------------------
+    # Chargement des P1 et statuts des boîtes
+    # ------------------------------------------------------------------
+    def load_p1(self) -> bool:
+        """
+        Charge les P1 sur l'Arduino en envoyant la commande 'c' suivie des
+        badges des clients (ou la trame binaire 'B' si binaryload=true).
+        Puis met à jour les statuts des boîtes et vérifie les logs.
+
+        Publie ERROR et retourne False si un nom n'a pas de badge.
+        """
+        try:
+            if self.config_store.get().binary_load:
+                message = self.build_load_frame()
+            else:
+                message = self.build_load_command()
+        except ValueError as e:
+            self.events.publish(ERROR, str(e))
+            return False
+
+        self.send_command(message, self._on_load_done)
+        self.events.publish(LOG, "Commande de chargement envoyée à l'Arduino")
+
+        # Mettre à jour les statuts après envoi (statut de base LOADED = bleu)
+        self.sync_boxes_status_with_logs(base_status=BoxStatus.LOADED)
+        self.events.publish(LOG, "Statuts des boîtes mis à jour")
+
+        # Passe tout de suite en surveillance rapide
+        self._health_monitor.wake()
+        return True
+
+    def _on_load_done(self, success: bool, response: str):
+        """Signale un chargement refusé par l'Arduino (ligne "ERR ...")."""
+        if success and response.startswith("ERR"):
+            self.events.publish(ERROR, f"Chargement refusé par l'Arduino: {response[3:].strip()}")
+
+    def sync_boxes_status_with_logs(self, base_status: BoxStatus = BoxStatus.LOADED):
+        """
+        Synchronise les statuts des boîtes avec les logs de current_date:
+        - Si utilisateur assigné ET nom dans logs → RETRIEVED (vert)
+        - Si utilisateur assigné ET nom NON dans logs → base_status (paramètre)
+        - Si pas d'utilisateur → EMPTY (vert)
+
+        Args:
+            base_status: Statut à appliquer si utilisateur assigné mais NON dans logs
+                        (BoxStatus.OCCUPIED après load_orders, BoxStatus.LOADED après load_p1)
+        """
+        badge_logs = self.load_logs_for_date(self.current_date)
+
+        # Créer un set des noms qui ont récupéré leur boîte
+        retrieved_names = {client_name.lower() for _, client_name in badge_logs}
+
+        # Mettre à jour les boîtes (une seule notification en fin de bloc)
+        self.model.sync_retrieved(retrieved_names, base_status)
+
+    def _badges_per_box(self) -> list[list[str]]:
+        """
+        Badges (max 2) de chaque boîte jusqu'à la dernière occupée,
+        liste vide pour une boîte vide.
+
+        Raises:
+            ValueError: Si un nom d'utilisateur n'a pas de badge correspondant
+        """
+        boxes = []
+
+        # Badges de chaque nom, cherchés une seule fois par commande
+        badges_by_name: dict[str, list[str]] = {}
+
+        for user_id in self.model.assigned_users():
+            if not user_id or not user_id.strip():
+                # Boîte vide
+                boxes.append([])
+                continue
+
+            # Chercher le(s) badge(s) pour ce nom
+            user_name = user_id.strip()
+            badges = badges_by_name.get(user_name)
+            if badges is None:
+                badges = badges_by_name[user_name] = self.find_badges_for_name(user_name)
+
+            if not badges:
+                raise ValueError(f"Nom: {user_name} inconnu du fichier de badges")
+            boxes.append(badges[:2])
+        return boxes
+
+    def build_load_command(self) -> str:
+        """
+        Construit la commande de chargement pour l'Arduino.
+        Format: c-BADGE1-BADGE2-00000000-BADGE3,BADGE3_2
+
+        Returns:
+            La commande à envoyer (sans le point final)
+
+        Raises:
+            ValueError: Si un nom d'utilisateur n'a pas de badge correspondant
+        """
+        # Boîtes jusqu'à la dernière occupée (aucune: juste "c"), badges
+        # d'une même boîte séparés par une virgule
+        message_parts = ["c"]
+        for badges in self._badges_per_box():
+            message_parts.append(",".join(badges) or "00000000")
+        return "-".join(message_parts)
+
+    def build_load_frame(self) -> bytes:
+        """
+        Construit la trame binaire de chargement ("B", voir load_frame).
+
+        Returns:
+            La trame à envoyer (sans le point final)
+
+        Raises:
+            ValueError: Si un nom n'a pas de badge ou si un badge n'est pas
+                un code hexadécimal de 32 bits
+        """
+        tags = []
+        for badges in self._badges_per_box():
+            codes = []
+            for badge in badges:
+                code = int(badge, 16)
+                if not 0 <= code <= 0xFFFFFFFF:
+                    raise ValueError(f"Badge {badge} invalide (32 bits maximum)")
+                codes.append(code)
+            codes += [0] * (2 - len(codes))
+            tags.append((codes[0], codes[1]))
+        return encode_load_frame(tags)
+
+    def find_badges_for_name(self, name: str) -> list[str]:
+        """
+        Trouve tous les badges correspondant à un nom d'utilisateur.
+
+        Args:
+            name: Nom de l'utilisateur à chercher
+
+        Returns:
+            Liste des codes de badges (max 2)
+        """
+        return self.badge_list.codes_for_name(name, limit=2)
+
+    # ------------------------------------------------------------------
+    # Communication Arduino
+    # ------------------------------------------------------------------
+    def _get_arduino(self) -> Optional[ArduinoConnection]:
+        """Retourne la session Arduino, recréée si l'adresse a changé."""
+        address = self.config_store.get().arduino_address
+        with self._arduino_lock:
+            if self._arduino is not None and self._arduino.address != address:
+                self._arduino.close()
+                self._arduino = None
+            if self._arduino is None and address is not None:
+                self._arduino = ArduinoConnection(*address)
+            return self._arduino
+
+    def send_command(
+        self,
+        message: str | bytes,
+        on_done: Optional[Callable[[bool, str], None]] = None,
+    ) -> Optional[Future]:
+        """
+        Envoie une commande à l'Arduino de manière asynchrone.
+
+        Args:
+            message: Message à envoyer à l'Arduino (texte, ou trame binaire)
+            on_done: Appelé dans le thread propriétaire avec (success, response)
+
+        Returns:
+            Le Future de la commande (partagé si une commande identique est
+            déjà en attente), ou None sans configuration Arduino
+        """
+        arduino = self._get_arduino()
+        if arduino is None:
+            self.events.publish(LOG, "Erreur: configuration Arduino introuvable")
+            return None
+
+        def _on_done(success: bool, response: str):
+            # Retour dans le thread propriétaire du modèle
+            def _notify():
+                if not success:
+                    self.events.publish(LOG, f"Erreur d'envoi: {response}")
+                if on_done is not None:
+                    on_done(success, response)
+            self.call_soon(_notify)
+
+        # La commande est exécutée dans l'ordre par le thread de la connexion
+        return arduino.submit(message, callback=_on_done)
+
+    def _check_arduino_status(self) -> bool:
+        """Vérifie la connexion Arduino et récupère les logs (thread de surveillance)."""
+        arduino = self._get_arduino()
+        # Test de connexion sur la session partagée avec les commandes
+        is_connected = arduino is not None and arduino.ping()
+        self._publish_soon(ARDUINO_STATUS, is_connected)
+
+        # Si Arduino est connecté, (ré)abonner aux badges et charger les logs
+        if is_connected:
+            push_port = self._update_push_listener()
+            # L'Arduino garde l'abonnement tant qu'il ne redémarre pas (ce
+            # qui coupe la session): "p" n'est renvoyé qu'après une
+            # reconnexion ou un changement de port
+            subscription = (arduino, arduino.connections, push_port)
+            if push_port is not None and subscription != self._push_subscription:
+                self._push_subscription = subscription
+                arduino.submit(f"p{push_port}", callback=self._on_push_subscribed)
+            self.fetch_logs()
+        return is_connected
+
+    def _on_push_subscribed(self, success: bool, response: str):
+        if not success:
+            # Abonnement à renvoyer à la prochaine vérification
+            self._push_subscription = None
+
+    def _update_push_listener(self) -> Optional[int]:
+        """Démarre, redémarre ou arrête l'écoute des badges selon la configuration.
+
+        Retourne le port à annoncer à l'Arduino ("p0" pour se désabonner),
+        ou None si l'écoute n'a jamais été activée.
+        """
+        config = self.config_store.get()
+        listener = self._push_listener
+        if listener is not None and (listener.port, listener.source_ip) == (config.push_port, config.ip):
+            return config.push_port
+        if listener is not None:
+            listener.stop()
+            self._push_listener = None
+        if not config.push_port:
+            return 0 if listener is not None else None
+
+        listener = PushListener(config.push_port, self._on_push_event, source_ip=config.ip)
+        try:
+            listener.start()
+        except OSError as e:
+            print(f"Écoute des badges sur le port {config.push_port} impossible: {e}")
+            return 0
+        self._push_listener = listener
+        return config.push_port
+
+    def _on_push_event(self, offset: int, logs_data: str):
+        """Badge reçu en direct de l'Arduino (thread d'écoute)."""
+        data_size = len(logs_data.encode("ascii", errors="replace"))
+        with self._log_lock:
+            cursor = self._read_log_cursor()
+            if offset + data_size <= cursor:
+                # Déjà reçu par "l"
+                return
+            if offset != cursor:
+                # Datagramme perdu: la récupération par "l" comble le trou
+                self._health_monitor.wake()
+                return
+            self._ingest_logs(logs_data)
+            self._write_log_cursor(offset + data_size)
+
+    # ------------------------------------------------------------------
+    # Logs de badges
+    # ------------------------------------------------------------------
+    def fetch_logs(self):
+        """
+        Récupère les nouveaux logs de l'Arduino avec la commande 'l<curseur>'.
+        Parse et sauvegarde les logs dans le fichier du mois courant.
+
+        Le curseur (position absolue dans le journal de l'Arduino) n'avance
+        qu'après la sauvegarde locale; l'Arduino ne supprime son journal que
+        lorsque tout son contenu a été acquitté par un curseur.
+        """
+        arduino = self._get_arduino()
+        if arduino is None:
+            print("Erreur: configuration Arduino introuvable")
+            return
+
+        with self._log_lock:
+            cursor, known_base = self._read_log_state()
+
+        # Requête sans le verrou: les badges reçus en direct ne doivent pas
+        # attendre un Arduino lent. Réponse tramée: les logs ne sont
+        # acceptés que si le nombre d'octets annoncé a été reçu.
+        success, chunk = arduino.request(f"l{cursor}", timeout=10.0, framed=True)
+
+        if not success:
+            print(f"Erreur lors de la récupération des logs: {chunk}")
+            return
+
+        with self._log_lock:
+            if self._read_log_state() != (cursor, known_base):
+                # Curseur avancé entre-temps (badge reçu en direct, autre
+                # récupération): la prochaine récupération repart de là
+                self._health_monitor.wake()
+                return
+
+            if chunk.base is not None and known_base is not None and chunk.base < known_base:
+                # Journal de l'Arduino recommencé (logbase.txt perdu): le
+                # curseur désigne un autre contenu, tout relire depuis le début
+                self._write_log_cursor(chunk.base, chunk.base)
+                self._health_monitor.wake()
+                return
+
+            # Ne consommer que des lignes complètes; le curseur compte des
+            # octets, même si le journal contient des octets non ASCII
+            consumed = chunk.payload.rfind(b"\n") + 1
+            self._ingest_logs(chunk.payload[:consumed].decode("ascii", errors="ignore"))
+
+            new_cursor = chunk.offset + consumed
+            if new_cursor != cursor or chunk.base != known_base:
+                self._write_log_cursor(new_cursor, chunk.base)
+
+    def _ingest_logs(self, logs_data: str):
+        """Sauvegarde des logs Arduino et met à jour les statuts (via call_soon)."""
+        if not logs_data.strip():
+            return
+
+        # Parser et sauvegarder les logs
+        new_logs = self.parse_and_save_logs(logs_data)
+
+        # Publier les nouveaux logs
+        if new_logs:
+            self._publish_soon(BADGE_LOGS, new_logs)
+
+        # Synchroniser les statuts des boîtes avec les logs
+        self.call_soon(self.sync_boxes_status_with_logs)
+
+    def _read_log_cursor(self) -> int:
+        """Lit la position du dernier log Arduino acquitté (0 par défaut)."""
+        return self._read_log_state()[0]
+
+    def _read_log_state(self) -> tuple[int, Optional[int]]:
+        """Lit (curseur, début du journal de l'Arduino lors de la dernière récupération)."""
+        try:
+            values = self.log_cursor_path.read_text(encoding="utf-8").split()
+            cursor = int(values[0])
+        except (OSError, ValueError, IndexError):
+            return 0, None
+        try:
+            return cursor, int(values[1])
+        except (ValueError, IndexError):
+            return cursor, None
+
+    def _write_log_cursor(self, cursor: int, base: Optional[int] = None):
+        """Enregistre la position du dernier log Arduino acquitté.
+
+        base (début du journal de l'Arduino) est conservé s'il n'est pas donné.
+        """
+        if base is None:
+            base = self._read_log_state()[1]
+        path = self.log_cursor_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(f"{cursor}\n" if base is None else f"{cursor}\n{base}\n", encoding="utf-8")
+        tmp_path.replace(path)
+
+    def parse_and_save_logs(self, logs_data: str) -> list[tuple[datetime, str]]:
+        """
+        Parse les logs Arduino et les sauvegarde dans le fichier du mois courant.
+
+        Format d'entrée: BADGE_DECIMAL;HH:MM:SS
+        Format de sortie: DD/MM/YYYY HH:MM:SS;NOM_CLIENT (ou BADGE_HEX si inconnu)
+
+        Retourne la liste des logs parsés avec leur timestamp complet.
+        """
+        if not logs_data or not logs_data.strip():
+            return []
+
+        # Obtenir la date/heure actuelle
+        now = datetime.now()
+        current_time = now.time()
+
+        # Parser chaque ligne de log
+        parsed_logs = []
+
+        for line in logs_data.strip().split('\n'):
+            line = line.strip()
+            if not line or ';' not in line:
+                continue
+
+            try:
+                badge_decimal, time_str = line.split(';', 1)
+                badge_decimal = badge_decimal.strip()
+                time_str = time_str.strip()
+
+                # Parser l'heure du log
+                log_time = datetime.strptime(time_str, "%H:%M:%S").time()
+
+                # Si l'heure du log est supérieure à l'heure actuelle, c'est hier
+                if log_time > current_time:
+                    log_datetime = datetime.combine(now.date(), log_time) - timedelta(days=1)
+                else:
+                    log_datetime = datetime.combine(now.date(), log_time)
+
+                # Convertir le badge décimal en hexadécimal (toujours 8 caractères)
+                badge_hex = f"{int(badge_decimal):08X}"
+
+                # Chercher le nom du client dans badge_list
+                client_name = badge_hex  # Par défaut, on garde le badge en hexa
+                badge = self.badge_list.find_by_decimal(badge_decimal)
+                if badge and badge.name:
+                    client_name = badge.name
+
+                # Ajouter à la liste des logs parsés (pour l'interface)
+                parsed_logs.append((log_datetime, client_name))
+
+            except (ValueError, IndexError) as e:
+                print(f"Erreur lors du parsing de la ligne '{line}': {e}")
+                continue
+
+        # Sauvegarder dans les fichiers mensuels (mode ajout, index par jour)
+        self.log_store.append(parsed_logs)
+
+        return parsed_logs
+
+    def load_logs_for_date(self, day: date) -> list[tuple[datetime, str]]:
+        """
+        Charge les logs de badges pour une date donnée depuis le fichier.
+
+        Args:
+            day: Date pour laquelle charger les logs
+
+        Returns:
+            Liste de tuples (datetime, nom_client)
+        """
+        try:
+            return self.log_store.load_day(day)
+        except OSError as e:
+            print(f"Erreur lors de la lecture du fichier {self.log_store.month_path(day)}: {e}")
+            return []
@@ -3,34 +3,27 @@ Utilitaires reseau.
 """
 
 from __future__ import annotations
+from concurrent.futures import Future
 from pathlib import Path
+import json
+import os
 import re
 import requests
-import socket
+import tempfile
+import threading
+import time
 
+from model.config import AppConfig, get_config_store
 
-def _read_config(config_path: Path) -> tuple[str, str]:
-	email = ""
-	password = ""
-	with config_path.open("r", encoding="utf-8") as handle:
-		for raw_line in handle:
-			line = raw_line.strip()
-			if not line or line.startswith("#"):
-				continue
-			if "=" not in line:
-				continue
-			key, value = line.split("=", 1)
-			key = key.strip().lower()
-			value = value.strip()
-			if key == "email":
-				email = value
-			elif key == "password":
-				password = value
-
-	if not email or not password:
+
+BASE_URL = "https://admin.souke.fr"
+
+
+def _read_credentials(config: AppConfig) -> tuple[str, str]:
+	if not config.email or not config.password:
 		raise ValueError("config.txt doit contenir email=... et password=...")
 
-	return email, password
+	return config.email, config.password
 
 
 def _extract_csrf(html: str) -> tuple[str, str] | None:
@@ -55,107 +48,193 @@ def _extract_csrf(html: str) -> tuple[str, str] | None:
 
 	return name, value
 
-def get_commandes(date: str) -> Path:
+class OrderClient:
 	"""
-	Telecharge les commandes pour une date (YYYY-MM-DD) et ecrit le CSV.
-	"""
-	base_dir = Path(__file__).resolve().parents[2]
-	config_path = base_dir / "config" / "config.txt"
-	output_path = base_dir / "commandes" / "commandes.csv"
-
-	email, password = _read_config(config_path)
-
-	login_url = "https://admin.souke.fr/site/login"
-	export_url = "https://admin.souke.fr/distribution/export"
-
-	payload = {
-		"LoginForm[email]": email,
-		"LoginForm[password]": password,
-	}
+	Telechargement des commandes avec une session authentifiee reutilisee.
 
-	output_path.parent.mkdir(parents=True, exist_ok=True)
+	Chaque date est mise en cache dans commandes/<date>.csv (metadonnees dans
+	commandes/<date>.json). Un cache plus recent que le TTL est servi sans
+	requete; au-dela, l'export est revalide (If-None-Match/If-Modified-Since).
+	La connexion n'est refaite que si l'export repond 302 ou 401.
 
-	with requests.Session() as session:
-		response = session.get(login_url, timeout=30)
-		response.raise_for_status()
-		csrf = _extract_csrf(response.text)
-		if csrf:
-			payload[csrf[0]] = csrf[1]
-
-		response = session.post(login_url, data=payload, timeout=30)
-		response.raise_for_status()
+	Un seul telechargement a la fois par date: un appel pour une date deja
+	en cours (ex: prechargement) attend son resultat.
+	"""
 
-		response = session.get(
-			export_url,
-			params={"name": "orders1_csv", "date": date},
-			timeout=30,
+	def __init__(self, base_url: str = BASE_URL, cache_dir: Path | None = None):
+		if cache_dir is None:
+			cache_dir = Path(__file__).resolve().parents[2] / "commandes"
+		self.base_url = base_url.rstrip("/")
+		self.cache_dir = Path(cache_dir)
+		self._session: requests.Session | None = None
+		self._logged_in = False
+		self._login_lock = threading.Lock()
+		# Telechargements en cours par date
+		self._inflight: dict[str, Future] = {}
+		self._inflight_lock = threading.Lock()
+
+	def cache_path(self, date: str) -> Path:
+		return self.cache_dir / f"{date}.csv"
+
+	def cached_is_fresh(self, date: str, ttl: float) -> bool:
+		"""Indique si le cache de la date a moins de ttl secondes."""
+		meta = self._read_meta(date)
+		return (
+			self.cache_path(date).exists()
+			and time.time() - meta.get("fetched_at", 0) < ttl
 		)
-		response.raise_for_status()
-
-		output_path.write_text(response.text, encoding="utf-8")
-
-	return output_path
-
 
-def check_arduino_connection(ip: str, port: int, timeout: float = 2.0) -> bool:
+	def fetch(self, date: str, config: AppConfig, force: bool = False) -> Path:
+		"""
+		Retourne le CSV des commandes d'une date (YYYY-MM-DD), telecharge si
+		le cache est absent, expire ou si force=True.
+		"""
+		with self._inflight_lock:
+			future = self._inflight.get(date)
+			owner = future is None
+			if owner:
+				future = Future()
+				self._inflight[date] = future
+		if not owner:
+			return future.result()
+
+		try:
+			path = self._fetch(date, config, force)
+		except BaseException as e:
+			future.set_exception(e)
+			raise
+		else:
+			future.set_result(path)
+			return path
+		finally:
+			with self._inflight_lock:
+				del self._inflight[date]
+
+	def _fetch(self, date: str, config: AppConfig, force: bool) -> Path:
+		path = self.cache_path(date)
+		if not force and self.cached_is_fresh(date, config.orders_cache_ttl):
+			return path
+
+		meta = self._read_meta(date)
+		headers = {}
+		if path.exists():
+			if meta.get("etag"):
+				headers["If-None-Match"] = meta["etag"]
+			if meta.get("last_modified"):
+				headers["If-Modified-Since"] = meta["last_modified"]
+
+		try:
+			response = self._export(date, config, headers)
+		except (requests.RequestException, ValueError):
+			if path.exists():
+				print(f"Erreur de telechargement des commandes du {date}, cache utilise")
+				return path
+			raise
+
+		if response.status_code != 304:
+			self._write_atomic(path, response.text)
+			meta = {
+				"etag": response.headers.get("ETag"),
+				"last_modified": response.headers.get("Last-Modified"),
+			}
+		meta["fetched_at"] = time.time()
+		self._write_meta(date, meta)
+		return path
+
+	def close(self):
+		if self._session is not None:
+			self._session.close()
+		self._session = None
+		self._logged_in = False
+
+	def _export(self, date: str, config: AppConfig, headers: dict) -> requests.Response:
+		for attempt in range(2):
+			if not self._logged_in:
+				self._login(config)
+			response = self._session.get(
+				f"{self.base_url}/distribution/export",
+				params={"name": "orders1_csv", "date": date},
+				headers=headers,
+				timeout=30,
+				allow_redirects=False,
+			)
+			if response.status_code in (301, 302, 303, 401) and attempt == 0:
+				# Session expiree: reconnexion puis nouvel essai
+				self._logged_in = False
+				continue
+			if response.status_code != 304:
+				response.raise_for_status()
+				if response.is_redirect:
+					raise requests.HTTPError(f"Export redirige ({response.status_code})", response=response)
+			return response
+
+	def _login(self, config: AppConfig):
+		email, password = _read_credentials(config)
+		with self._login_lock:
+			if self._logged_in:
+				return
+			if self._session is None:
+				self._session = requests.Session()
+
+			login_url = f"{self.base_url}/site/login"
+			payload = {
+				"LoginForm[email]": email,
+				"LoginForm[password]": password,
+			}
+
+			response = self._session.get(login_url, timeout=30)
+			response.raise_for_status()
+			csrf = _extract_csrf(response.text)
+			if csrf:
+				payload[csrf[0]] = csrf[1]
+
+			response = self._session.post(login_url, data=payload, timeout=30)
+			response.raise_for_status()
+			self._logged_in = True
+
+	def _meta_path(self, date: str) -> Path:
+		return self.cache_dir / f"{date}.json"
+
+	def _read_meta(self, date: str) -> dict:
+		try:
+			return json.loads(self._meta_path(date).read_text(encoding="utf-8"))
+		except (OSError, ValueError):
+			return {}
+
+	def _write_meta(self, date: str, meta: dict):
+		self._write_atomic(self._meta_path(date), json.dumps(meta))
+
+	def _write_atomic(self, path: Path, text: str):
+		"""Ecrit un fichier temporaire unique puis le renomme en path."""
+		self.cache_dir.mkdir(parents=True, exist_ok=True)
+		with tempfile.NamedTemporaryFile(
+			"w", encoding="utf-8", dir=self.cache_dir, suffix=".tmp", delete=False
+		) as tmp_file:
+			tmp_file.write(text)
+		try:
+			os.replace(tmp_file.name, path)
+		except OSError:
+			os.unlink(tmp_file.name)
+			raise
+
+
+_order_client: OrderClient | None = None
+
+
+def get_order_client() -> OrderClient:
+	"""Retourne le client de commandes partage (session reutilisee)."""
+	global _order_client
+	if _order_client is None:
+		_order_client = OrderClient()
+	return _order_client
+
+
+def get_commandes(date: str, config: AppConfig | None = None, force: bool = False) -> Path:
 	"""
-	Vérifie si l'Arduino est accessible via TCP.
-	
-	Args:
-		ip: Adresse IP de l'Arduino
-		port: Port de connexion
-		timeout: Délai d'attente en secondes (défaut: 2.0)
-	
-	Returns:
-		True si la connexion est établie, False sinon
+	Telecharge (ou lit en cache) les commandes pour une date (YYYY-MM-DD)
+	et retourne le chemin du CSV.
 	"""
-	try:
-		with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-			sock.settimeout(timeout)
-			sock.connect((ip, port))
-			return True
-	except (socket.timeout, socket.error, OSError):
-		return False
-
+	if config is None:
+		config = get_config_store().get()
+	return get_order_client().fetch(date, config, force=force)
 
-def send_arduino_command(ip: str, port: int, message: str, timeout: float = 5.0, buffer_size: int = 256) -> tuple[bool, str]:
-	"""
-	Envoie une commande à l'Arduino via TCP et lit la réponse.
-	
-	Args:
-		ip: Adresse IP de l'Arduino
-		port: Port de connexion
-		message: Message à envoyer (un point sera ajouté automatiquement)
-		timeout: Délai d'attente en secondes (défaut: 5.0)
-		buffer_size: Taille du buffer de réception en octets (défaut: 256)
-	
-	Returns:
-		Tuple (success, response) où success indique si l'envoi a réussi
-		et response contient la réponse de l'Arduino ou un message d'erreur
-	"""
-	try:
-		with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-			sock.settimeout(timeout)
-			sock.connect((ip, port))
-			
-			# Ajouter un point à la fin du message et encoder en ASCII
-			full_message = message + "."
-			data = full_message.encode('ascii')
-			
-			# Envoyer les données
-			sock.sendall(data)
-			
-			# Lire la réponse du serveur
-			response_data = sock.recv(buffer_size)
-			response = response_data.decode('ascii', errors='ignore')
-			
-			return (True, response)
-			
-	except socket.timeout:
-		return (False, "Timeout: pas de réponse de l'Arduino")
-	except socket.error as e:
-		return (False, f"Erreur de socket: {e}")
-	except OSError as e:
-		return (False, f"Erreur: {e}")
-	except Exception as e:
-		return (False, f"Erreur inattendue: {e}")
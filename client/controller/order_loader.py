@@ -0,0 +1,88 @@
+"""
+Chargement des commandes en arrière-plan (LockerCore et FleetCore).
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date
+from typing import Any, Callable, Optional
+
+from model.config import AppConfig
+from model.orders import Order, read_order_file
+from controller import network_utils
+from controller.order_prefetcher import OrderPrefetcher
+
+
+class OrderLoader:
+    """Télécharge, lit et prépare les commandes d'une date, un chargement à la fois.
+
+    Le téléchargement, la lecture et stage(commandes) sont exécutés dans un
+    thread dédié: stage ne doit pas lire les modèles (voir
+    BreadBoxModel.free_layout). Le résultat est passé à commit dans le
+    thread propriétaire des modèles (call_soon). Un chargement remplacé par
+    une sélection plus récente est abandonné; les dates voisines sont
+    ensuite préchargées.
+    """
+
+    def __init__(self, call_soon: Callable[..., None], on_error: Callable[[str], None]):
+        self.call_soon = call_soon
+        self.on_error = on_error
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="commandes")
+        self._future: Optional[Future] = None
+        self._generation = 0
+        self._prefetcher = OrderPrefetcher()
+
+    def load(
+        self,
+        day: date,
+        config: AppConfig,
+        stage: Callable[[list[Order]], Any],
+        commit: Callable[[Any], None],
+    ):
+        """Lance le chargement des commandes de day (depuis le thread propriétaire)."""
+        date_str = day.strftime("%Y-%m-%d")
+
+        self._generation += 1
+        generation = self._generation
+        if self._future is not None:
+            self._future.cancel()
+
+        def _stage():
+            if generation != self._generation:
+                return None
+            # En mode debug, commandes/commandes.csv est utilisé tel quel
+            commandes_path = None
+            if not config.debug_mode:
+                commandes_path = network_utils.get_commandes(date_str, config)
+            if generation != self._generation:
+                return None
+            orders = read_order_file(commandes_path)
+            if orders is None:
+                return None
+            staged = stage(orders)
+            # Dates voisines préchargées pour une navigation immédiate
+            self._prefetcher.prefetch_around(day, config)
+            return staged
+
+        future = self._executor.submit(_stage)
+        self._future = future
+        future.add_done_callback(
+            lambda f: self.call_soon(self._commit, generation, f, commit)
+        )
+
+    def _commit(self, generation: int, future: Future, commit: Callable[[Any], None]):
+        """Applique un chargement préparé par load (thread propriétaire)."""
+        if generation != self._generation or future.cancelled():
+            return
+        try:
+            staged = future.result()
+        except Exception as e:
+            self.on_error(f"Erreur de chargement des commandes: {e}")
+            return
+        if staged is not None:
+            commit(staged)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._prefetcher.shutdown()
@@ -0,0 +1,75 @@
+"""
+Préchargement des commandes des dates voisines.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date, timedelta
+import threading
+
+from model.config import AppConfig
+from model.orders import read_orders
+from controller import network_utils
+
+
+class OrderPrefetcher:
+    """Télécharge et parse en arrière-plan les commandes autour d'une date.
+
+    Les résultats alimentent le cache par date de network_utils et le cache
+    de parsing de read_orders, si bien que changer de date devient immédiat.
+    Le nombre de téléchargements simultanés est limité par prefetch_workers.
+    """
+
+    def __init__(self):
+        self._executor: ThreadPoolExecutor | None = None
+        self._max_workers = 0
+        self._pending: list[Future] = []
+        self._lock = threading.Lock()
+
+    def prefetch_around(self, day: date, config: AppConfig):
+        """Précharge les prefetch_days jours avant et après day.
+
+        Les préchargements encore en attente pour une date précédente sont
+        annulés.
+        """
+        with self._lock:
+            for future in self._pending:
+                future.cancel()
+            self._pending = []
+
+            if config.debug_mode or config.prefetch_days <= 0 or config.prefetch_workers <= 0:
+                return
+
+            if self._executor is None or self._max_workers != config.prefetch_workers:
+                if self._executor is not None:
+                    self._executor.shutdown(wait=False)
+                self._max_workers = config.prefetch_workers
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_workers, thread_name_prefix="prefetch"
+                )
+
+            # Les dates les plus proches d'abord
+            for offset in range(1, config.prefetch_days + 1):
+                for neighbour in (day + timedelta(days=offset), day - timedelta(days=offset)):
+                    self._pending.append(
+                        self._executor.submit(self._prefetch, neighbour.strftime("%Y-%m-%d"), config)
+                    )
+
+    def shutdown(self):
+        with self._lock:
+            for future in self._pending:
+                future.cancel()
+            self._pending = []
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+    @staticmethod
+    def _prefetch(date_str: str, config: AppConfig):
+        try:
+            path = network_utils.get_commandes(date_str, config)
+            read_orders(path)
+        except Exception as e:
+            # Préchargement silencieux: la date sera téléchargée à la demande
+            print(f"Préchargement des commandes du {date_str} impossible: {e}")
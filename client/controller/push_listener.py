@@ -0,0 +1,80 @@
+"""
+Réception des badges envoyés par l'Arduino (UDP).
+"""
+
+from __future__ import annotations
+
+import socket
+import threading
+from typing import Callable
+
+
+class PushListener:
+    """Écoute les datagrammes "E<position>\\n<lignes>" de l'Arduino.
+
+    L'Arduino envoie chaque badge dès son enregistrement au client abonné
+    (commande "p<port>"). Le callback reçoit la position absolue et les
+    lignes brutes, dans le thread d'écoute. Les datagrammes qui ne viennent
+    pas de source_ip sont ignorés.
+    """
+
+    MAX_DATAGRAM = 512
+
+    def __init__(
+        self,
+        port: int,
+        on_event: Callable[[int, str], None],
+        source_ip: str | None = None,
+    ):
+        self.port = port
+        self.source_ip = source_ip
+        self._on_event = on_event
+        self._sock: socket.socket | None = None
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self):
+        """Ouvre le port d'écoute (lève OSError s'il est indisponible)."""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.bind(("", self.port))
+        # Délai court pour que stop() soit pris en compte rapidement
+        sock.settimeout(0.5)
+        self._sock = sock
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="arduino-push", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    @staticmethod
+    def parse_datagram(data: bytes) -> tuple[int, str] | None:
+        """Retourne (position, lignes) ou None si le datagramme est invalide."""
+        header, sep, payload = data.partition(b"\n")
+        if not sep or not header.startswith(b"E") or not header[1:].isdigit():
+            return None
+        return int(header[1:]), payload.decode("ascii", errors="replace")
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                data, (host, _) = self._sock.recvfrom(self.MAX_DATAGRAM)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            if self.source_ip is not None and host != self.source_ip:
+                continue
+            event = self.parse_datagram(data)
+            if event is None:
+                continue
+            try:
+                self._on_event(*event)
+            except Exception as e:
+                print(f"Erreur lors du traitement d'un badge reçu: {e}")
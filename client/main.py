@@ -1,13 +1,61 @@
 #!/usr/bin/env python3
 """
 Point d'entrée principal de l'application P1-Singulier
+
+    python main.py              interface graphique
+    python main.py --headless   service sans interface (logs sur la console)
 """
 
-from controller.app_controller import AppController
+import argparse
+from datetime import date, datetime
+
+
+def run_headless():
+    """Lance le cœur de l'application sans interface graphique"""
+    from controller.event_bus import ARDUINO_STATUS, BADGE_LOGS, ERROR, LOG, EventLoop
+    from controller.fleet_core import FleetCore
+
+    loop = EventLoop()
+    fleet = FleetCore(call_soon=loop.call_soon)
+
+    for core in fleet.cores:
+        prefix = f"[{core.name}] " if core.name else ""
 
+        def _print(message: str, prefix=prefix):
+            print(f"{datetime.now().strftime('%H:%M:%S')} - {prefix}{message}")
+
+        core.events.subscribe(LOG, _print)
+        core.events.subscribe(ERROR, lambda message, out=_print: out(f"Erreur: {message}"))
+        core.events.subscribe(
+            ARDUINO_STATUS,
+            lambda connected, out=_print: out("Arduino connecté" if connected else "Arduino déconnecté"),
+        )
+        core.events.subscribe(
+            BADGE_LOGS,
+            lambda logs, out=_print: [out(f"Badge: {name}") for _, name in logs],
+        )
+
+    fleet.load_orders(date.today())
+    fleet.start()
+    try:
+        loop.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        fleet.stop()
 
 def main():
     """Lance l'application"""
+    parser = argparse.ArgumentParser(description="P1-Singulier")
+    parser.add_argument("--headless", action="store_true", help="sans interface graphique")
+    args = parser.parse_args()
+
+    if args.headless:
+        run_headless()
+        return
+
+    from controller.app_controller import AppController
+
     app = AppController()
     app.run()
 
@@ -0,0 +1,163 @@
+"""
+Stockage en colonnes de l'état des boîtes.
+"""
+
+from __future__ import annotations
+
+from array import array
+import threading
+from typing import Optional
+
+
+class BoxStore:
+    """État de toutes les boîtes d'un modèle, une colonne (array) par champ.
+
+    - status: code du statut (indice dans la liste des BoxStatus);
+    - size: 1 (simple) ou 2 (double);
+    - user, bread: indice dans une table de noms partagée, -1 si aucun
+      (compact_names retire les noms devenus inutilisés);
+    - retrieved: 0 ou 1;
+    - timestamp: microsecondes depuis l'epoch, 0 si jamais modifiée.
+
+    Les colonnes status et size se lisent directement mais se modifient
+    par set_status, set_size et swap, qui tiennent à jour en O(1) un
+    compteur par (taille, statut). Les recherches par statut se font sur
+    les colonnes (code C de array/bytes) plutôt qu'en parcourant des objets
+    Python.
+
+    Les compteurs sont modifiés et lus sous un verrou: snapshot peut être
+    appelé depuis un autre thread que celui qui possède le modèle.
+    """
+
+    def __init__(self, sizes: list[int], empty_code: int = 0, num_codes: int = 1):
+        count = len(sizes)
+        self.num_codes = max(num_codes, empty_code + 1)
+        self.status = array("b", [empty_code]) * count
+        self.size = array("b", sizes)
+        # Nombre de boîtes par taille puis par code de statut
+        self._lock = threading.Lock()
+        self._counts: dict[int, list[int]] = {}
+        for size in sizes:
+            self._size_counts(size)[empty_code] += 1
+        self.user = array("i", [-1]) * count
+        self.bread = array("i", [-1]) * count
+        self.retrieved = array("b", [0]) * count
+        self.timestamp = array("q", [0]) * count
+        self._names: list[str] = []
+        self._name_ids: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.status)
+
+    def intern(self, name: Optional[str]) -> int:
+        """Indice de name dans la table des noms (-1 pour None)."""
+        if name is None:
+            return -1
+        index = self._name_ids.get(name)
+        if index is None:
+            index = len(self._names)
+            self._names.append(name)
+            self._name_ids[name] = index
+        return index
+
+    def compact_names(self):
+        """Retire de la table les noms qui ne sont plus utilisés par aucune boîte.
+
+        Les indices des colonnes user et bread sont renumérotés: un indice
+        lu avant l'appel n'est plus valable après.
+        """
+        used = sorted({index for column in (self.user, self.bread) for index in column if index >= 0})
+        if len(used) == len(self._names):
+            return
+        remap = {old: new for new, old in enumerate(used)}
+        remap[-1] = -1
+        self._names = [self._names[index] for index in used]
+        self._name_ids = {name: index for index, name in enumerate(self._names)}
+        for column in (self.user, self.bread):
+            for position, index in enumerate(column):
+                column[position] = remap[index]
+
+    def name(self, index: int) -> Optional[str]:
+        return self._names[index] if index >= 0 else None
+
+    @property
+    def names(self) -> list[str]:
+        """Table des noms (indice -> nom), à ne pas modifier."""
+        return self._names
+
+    def _size_counts(self, size: int) -> list[int]:
+        counts = self._counts.get(size)
+        if counts is None:
+            counts = self._counts[size] = [0] * self.num_codes
+        return counts
+
+    def _move(self, index: int, code: int):
+        """Change le statut de index et ses compteurs (verrou déjà pris)."""
+        old = self.status[index]
+        if old != code:
+            counts = self._counts[self.size[index]]
+            counts[old] -= 1
+            counts[code] += 1
+            self.status[index] = code
+
+    def set_status(self, index: int, code: int):
+        with self._lock:
+            self._move(index, code)
+
+    def set_size(self, index: int, size: int):
+        with self._lock:
+            old = self.size[index]
+            if old != size:
+                code = self.status[index]
+                self._counts[old][code] -= 1
+                self._size_counts(size)[code] += 1
+                self.size[index] = size
+
+    def swap(self, a: int, b: int):
+        """Échange statut, utilisateur, pain et date des boîtes a et b (pas la taille)."""
+        with self._lock:
+            status_a, status_b = self.status[a], self.status[b]
+            self._move(a, status_b)
+            self._move(b, status_a)
+        for column in (self.user, self.bread, self.timestamp):
+            column[a], column[b] = column[b], column[a]
+
+    def count(self, code: int) -> int:
+        """Nombre de boîtes dont le statut vaut code."""
+        with self._lock:
+            return sum(counts[code] for counts in self._counts.values())
+
+    def counts_by_size(self) -> dict[int, list[int]]:
+        """Copie des compteurs: taille -> nombre de boîtes par code de statut."""
+        return self.snapshot()[1]
+
+    def snapshot(self) -> tuple[list[int], dict[int, list[int]]]:
+        """Copie cohérente des compteurs, lue sous un seul verrou.
+
+        Returns:
+            (nombre de boîtes par code de statut,
+             taille -> nombre de boîtes par code de statut)
+        """
+        with self._lock:
+            by_size = {size: list(counts) for size, counts in sorted(self._counts.items())}
+        totals = [sum(column) for column in zip(*by_size.values())] or [0] * self.num_codes
+        return totals, by_size
+
+    def indexes_of(self, code: int) -> list[int]:
+        """Indices des boîtes dont le statut vaut code, dans l'ordre."""
+        data = self.status.tobytes()
+        needle = bytes((code,))
+        indexes = []
+        position = data.find(needle)
+        while position >= 0:
+            indexes.append(position)
+            position = data.find(needle, position + 1)
+        return indexes
+
+    def last_assigned(self) -> int:
+        """Indice de la dernière boîte avec un utilisateur non vide (-1 si aucune)."""
+        for index in range(len(self.user) - 1, -1, -1):
+            user = self.user[index]
+            if user >= 0 and self._names[user]:
+                return index
+        return -1
@@ -2,11 +2,18 @@
 Modèle de données pour les boîtes à pain
 """
 
+from contextlib import contextmanager
+from dataclasses import dataclass
 from enum import Enum
-from typing import List, Optional
+from typing import List, NamedTuple, Optional, Set, Tuple
 from datetime import datetime
 from pathlib import Path
 
+from model.box_store import BoxStore
+from model.config import AppConfig, ConfigStore, get_config_store
+from model.orders import Order, read_order_file
+from model.placement import plan_placement
+
 
 class BoxStatus(Enum):
     """États possibles d'une boîte"""
@@ -18,17 +25,84 @@ class BoxStatus(Enum):
     ERROR = "error"           # Erreur
 
 
+# Codes des statuts dans BoxStore.status
+STATUSES: List[BoxStatus] = list(BoxStatus)
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+
+
+def _status_counts(counts: List[int]) -> dict:
+    """{'total': n, statut: n, ...} à partir d'un compteur par code de statut."""
+    stats = {'total': sum(counts)}
+    for status, code in STATUS_CODES.items():
+        stats[status.value] = counts[code]
+    return stats
+
+
+def _to_micros(value: Optional[datetime]) -> int:
+    return int(value.timestamp() * 1_000_000) if value is not None else 0
+
+
 class Box:
-    """Représente une boîte à pain"""
+    """Vue sur une boîte à pain (ligne box_id des colonnes du BoxStore)"""
+    
+    __slots__ = ("id", "changed_fields", "_store", "_dirty_ids")
     
-    def __init__(self, box_id: int, size: int = 1):
+    def __init__(self, store: BoxStore, box_id: int, dirty_ids: Optional[Set[int]] = None):
         self.id = box_id
-        self.size = size
-        self.status = BoxStatus.EMPTY
-        self.user_id: Optional[str] = None
-        self.bread_name: Optional[str] = None
-        self.timestamp: Optional[datetime] = None
-        self.retrieved: bool = False  # Indique si la boîte a été récupérée
+        # Champs modifiés depuis la dernière notification du modèle
+        self.changed_fields: Set[str] = set()
+        self._store = store
+        self._dirty_ids = dirty_ids
+    
+    @property
+    def size(self) -> int:
+        return self._store.size[self.id]
+    
+    @size.setter
+    def size(self, value: int):
+        self._store.set_size(self.id, value)
+    
+    @property
+    def status(self) -> BoxStatus:
+        return STATUSES[self._store.status[self.id]]
+    
+    @status.setter
+    def status(self, value: BoxStatus):
+        self._store.set_status(self.id, STATUS_CODES[value])
+    
+    @property
+    def user_id(self) -> Optional[str]:
+        return self._store.name(self._store.user[self.id])
+    
+    @user_id.setter
+    def user_id(self, value: Optional[str]):
+        self._store.user[self.id] = self._store.intern(value)
+    
+    @property
+    def bread_name(self) -> Optional[str]:
+        return self._store.name(self._store.bread[self.id])
+    
+    @bread_name.setter
+    def bread_name(self, value: Optional[str]):
+        self._store.bread[self.id] = self._store.intern(value)
+    
+    @property
+    def retrieved(self) -> bool:
+        """Indique si la boîte a été récupérée"""
+        return bool(self._store.retrieved[self.id])
+    
+    @retrieved.setter
+    def retrieved(self, value: bool):
+        self._store.retrieved[self.id] = int(value)
+    
+    @property
+    def timestamp(self) -> Optional[datetime]:
+        micros = self._store.timestamp[self.id]
+        return datetime.fromtimestamp(micros / 1_000_000) if micros else None
+    
+    @timestamp.setter
+    def timestamp(self, value: Optional[datetime]):
+        self._store.timestamp[self.id] = _to_micros(value)
     
     def set_status(
         self,
@@ -37,38 +111,132 @@ class Box:
         bread_name: Optional[str] = None,
         retrieved: bool = False,
     ):
-        """Change le statut de la boîte"""
-        self.status = status
-        self.user_id = user_id
-        self.retrieved = retrieved
+        """Change le statut de la boîte (sans effet si rien ne change)"""
+        store = self._store
+        box_id = self.id
+        status_code = STATUS_CODES[status]
+        user = store.intern(user_id)
         if status == BoxStatus.EMPTY:
-            self.bread_name = None
-        elif bread_name is not None:
-            self.bread_name = bread_name
-        self.timestamp = datetime.now()
+            bread = -1
+        elif bread_name is None:
+            bread = store.bread[box_id]
+        else:
+            bread = store.intern(bread_name)
+
+        changed = [
+            name for name, column, value in (
+                ("status", store.status, status_code),
+                ("user_id", store.user, user),
+                ("bread_name", store.bread, bread),
+                ("retrieved", store.retrieved, int(retrieved)),
+            )
+            if column[box_id] != value
+        ]
+        if not changed:
+            return
+        store.set_status(box_id, status_code)
+        store.user[box_id] = user
+        store.bread[box_id] = bread
+        store.retrieved[box_id] = int(retrieved)
+        store.timestamp[box_id] = _to_micros(datetime.now())
+        self.mark_changed(*changed, "timestamp")
+    
+    def mark_changed(self, *fields: str):
+        """Note des champs modifiés et signale la boîte au modèle"""
+        self.changed_fields.update(fields)
+        if self._dirty_ids is not None:
+            self._dirty_ids.add(self.id)
     
     def is_available(self) -> bool:
         """Vérifie si la boîte est disponible"""
         return self.status == BoxStatus.EMPTY
 
 
+class FreeBox(NamedTuple):
+    """Boîte non réservée, telle qu'au moment de la préparation d'un chargement"""
+
+    id: int
+    size: int
+
+
+@dataclass
+class StagedLoad:
+    """Remplissage préparé: (id de boîte, utilisateur, contenu) et restes.
+
+    orders et layout (boîtes libres utilisées pour le placement) permettent
+    de refaire le placement si les boîtes ont changé avant l'application.
+    """
+
+    assignments: List[Tuple[int, str, str]]
+    unplaced: List[Order]
+    orders: List[Order]
+    layout: Tuple[FreeBox, ...]
+
+
 class BreadBoxModel:
-    """Modèle principal gérant les 28 boîtes"""
+    """Modèle principal gérant les boîtes (28 par défaut).
+
+    L'état des boîtes est stocké en colonnes (BoxStore); self.boxes contient
+    une vue Box par boîte.
+
+    config_store n'est lu qu'à la création: les modifications de config.txt
+    sont appliquées par apply_config, depuis le thread propriétaire du
+    modèle (voir LockerCore).
+    """
     
-    def __init__(self, num_boxes: int = 28):
+    def __init__(self, num_boxes: int = 28, config_store: Optional[ConfigStore] = None):
         self.num_boxes = num_boxes
-        sizes = self._read_box_sizes(num_boxes)
-        self.boxes: List[Box] = [Box(i, sizes[i]) for i in range(num_boxes)]
+        self.config_store = config_store or get_config_store()
+        sizes = self.config_store.get().box_sizes_for(num_boxes)
+        # Boîtes modifiées depuis la dernière notification
+        self._dirty_ids: Set[int] = set()
+        self.store = BoxStore(sizes, STATUS_CODES[BoxStatus.EMPTY], len(STATUSES))
+        self.boxes: List[Box] = [Box(self.store, i, self._dirty_ids) for i in range(num_boxes)]
         self._observers = []
+        self._batch_depth = 0
+
+    def apply_config(self, config: AppConfig):
+        """Applique les nouvelles tailles de boîtes après modification de config.txt"""
+        with self.batch():
+            for box, size in zip(self.boxes, config.box_sizes_for(self.num_boxes)):
+                if box.size != size:
+                    box.size = size
+                    box.mark_changed("size")
     
     def register_observer(self, callback):
         """Enregistre un observateur pour les changements"""
         self._observers.append(callback)
     
     def notify_observers(self):
-        """Notifie tous les observateurs des changements"""
+        """Notifie les observateurs avec l'ensemble des boîtes modifiées.
+
+        Rien n'est notifié si aucune boîte n'a changé depuis la dernière
+        notification, ni à l'intérieur d'un batch().
+        """
+        if self._batch_depth > 0 or not self._dirty_ids:
+            return
+        changed_ids = set(self._dirty_ids)
+        self._dirty_ids.clear()
         for callback in self._observers:
-            callback()
+            callback(changed_ids)
+        for box_id in changed_ids:
+            self.boxes[box_id].changed_fields.clear()
+    
+    @contextmanager
+    def batch(self):
+        """Regroupe des modifications: une seule notification en sortie.
+
+        Les notifications demandées pendant le bloc sont suspendues; les
+        boîtes modifiées sont fusionnées et notifiées à la sortie du bloc le
+        plus externe.
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self.notify_observers()
     
     def get_box(self, box_id: int) -> Optional[Box]:
         """Récupère une boîte par son ID"""
@@ -89,20 +257,73 @@ class BreadBoxModel:
     
     def get_available_boxes(self) -> List[Box]:
         """Retourne la liste des boîtes disponibles"""
-        return [box for box in self.boxes if box.is_available()]
+        return [self.boxes[box_id] for box_id in self.store.indexes_of(STATUS_CODES[BoxStatus.EMPTY])]
     
+    def has_pending_retrievals(self) -> bool:
+        """Indique si des boîtes chargées n'ont pas encore été récupérées"""
+        return self.store.count(STATUS_CODES[BoxStatus.LOADED]) > 0
+    
+    def snapshot(self) -> dict:
+        """Compteurs par statut et par taille, lus ensemble.
+
+        {'total': n, statut: n, ..., 'by_size': {taille: {'total': n, statut: n, ...}}}
+
+        Lecture des compteurs tenus à jour par le BoxStore, sous son verrou:
+        peut être appelé à chaque rafraîchissement, y compris depuis un autre
+        thread (exporteur), sans parcourir les boîtes.
+        """
+        totals, by_size = self.store.snapshot()
+        stats = _status_counts(totals)
+        stats['by_size'] = {size: _status_counts(counts) for size, counts in by_size.items()}
+        return stats
+
     def get_statistics(self) -> dict:
-        """Retourne des statistiques sur les boîtes"""
-        stats = {
-            'total': self.num_boxes,
-            'empty': 0,
-            'occupied': 0,
-            'reserved': 0,
-            'error': 0
-        }
-        for box in self.boxes:
-            stats[box.status.value] += 1
+        """Retourne des statistiques sur les boîtes (un compteur par statut)."""
+        stats = self.snapshot()
+        del stats['by_size']
         return stats
+    
+    def get_size_statistics(self) -> dict:
+        """Compteurs par taille de boîte: {taille: {'total': n, statut: n, ...}}"""
+        return self.snapshot()['by_size']
+    
+    def assigned_users(self) -> List[Optional[str]]:
+        """Utilisateur de chaque boîte (None si aucun), jusqu'à la dernière affectée"""
+        store = self.store
+        return [store.name(user) for user in store.user[:store.last_assigned() + 1]]
+    
+    def sync_retrieved(self, retrieved_names: Set[str], base_status: BoxStatus):
+        """Met à jour les statuts selon les noms (en minuscules) ayant badgé.
+
+        - utilisateur assigné et dans retrieved_names → RETRIEVED;
+        - utilisateur assigné sinon → base_status;
+        - pas d'utilisateur → EMPTY (sauf boîte réservée).
+
+        La correspondance est calculée une fois par nom de la table (et non
+        par boîte); seules les boîtes dont l'état change sont modifiées.
+        """
+        store = self.store
+        is_retrieved = [name.strip().lower() in retrieved_names for name in store.names]
+        empty = STATUS_CODES[BoxStatus.EMPTY]
+        reserved = STATUS_CODES[BoxStatus.RESERVED]
+        retrieved_code = STATUS_CODES[BoxStatus.RETRIEVED]
+        base_code = STATUS_CODES[base_status]
+
+        with self.batch():
+            for box_id, (user, status, retrieved) in enumerate(
+                zip(store.user, store.status, store.retrieved)
+            ):
+                if user < 0 or not store.names[user]:
+                    if status != reserved and status != empty:
+                        self.boxes[box_id].set_status(BoxStatus.EMPTY)
+                    continue
+                if is_retrieved[user]:
+                    if status != retrieved_code or not retrieved:
+                        box = self.boxes[box_id]
+                        box.set_status(BoxStatus.RETRIEVED, box.user_id, box.bread_name, retrieved=True)
+                elif status != base_code or retrieved:
+                    box = self.boxes[box_id]
+                    box.set_status(base_status, box.user_id, box.bread_name, retrieved=False)
 
     def swap_box_contents(self, box_id_a: int, box_id_b: int) -> bool:
         """Intervertit le contenu de deux boîtes (sans changer leur id/size)."""
@@ -113,192 +334,99 @@ class BreadBoxModel:
         if not box_a or not box_b:
             return False
 
-        box_a.status, box_b.status = box_b.status, box_a.status
-        box_a.user_id, box_b.user_id = box_b.user_id, box_a.user_id
-        box_a.bread_name, box_b.bread_name = box_b.bread_name, box_a.bread_name
-        box_a.timestamp, box_b.timestamp = box_b.timestamp, box_a.timestamp
+        self.store.swap(box_id_a, box_id_b)
+        fields = ("status", "user_id", "bread_name", "timestamp")
+        box_a.mark_changed(*fields)
+        box_b.mark_changed(*fields)
         self.notify_observers()
         return True
 
     def reset_boxes(self):
-        """Remet toutes les boîtes non réservées à l'état EMPTY."""
-        for box in self.boxes:
-            if box.status != BoxStatus.RESERVED:
-                box.set_status(BoxStatus.EMPTY)
-        self.notify_observers()
-
-    def _read_box_sizes(self, num_boxes: int) -> List[int]:
-        base_dir = Path(__file__).resolve().parents[2]
-        config_path = base_dir / "config" / "config.txt"
-        sizes = [1] * num_boxes
-
-        if not config_path.exists():
-            return sizes
-
-        with config_path.open("r", encoding="utf-8") as handle:
-            for raw_line in handle:
-                line = raw_line.strip()
-                if not line or line.startswith("#") or "=" not in line:
-                    continue
-                key, value = line.split("=", 1)
-                key = key.strip().lower()
-                value = value.strip()
-                if not key.startswith("box"):
-                    continue
-                index_str = key[3:]
-                if not index_str.isdigit():
-                    continue
-                box_index = int(index_str) - 1
-                if not (0 <= box_index < num_boxes):
-                    continue
-                try:
-                    size = int(value)
-                except ValueError:
-                    continue
-                if size not in (1, 2):
-                    continue
-                sizes[box_index] = size
-
-        return sizes
-
-    def load_pains(self):
-        """Charge les pains depuis commandes.csv et remplit les boîtes."""
-        base_dir = Path(__file__).resolve().parents[2]
-        commandes_path = base_dir / "commandes" / "commandes.csv"
-        if not commandes_path.exists():
-            return
-        if commandes_path.stat().st_size == 0:
-            for box in self.boxes:
-                if box.status != BoxStatus.RESERVED:
-                    box.set_status(BoxStatus.EMPTY)
-            self.notify_observers()
-            return
-
-        self.reset_boxes()
-        
-        def _parse_quantity(value: str) -> int:
-            clean = value.strip().replace(",", ".")
-            if not clean:
-                return 0
-            try:
-                qty = int(float(clean))
-            except ValueError:
-                return 0
-            return qty if qty >= 1 else 0
-
-        def _strip_quotes(value: str) -> str:
-            clean = value.strip()
-            if len(clean) >= 2 and clean[0] == '"' and clean[-1] == '"':
-                return clean[1:-1]
-            return clean
-
-        def _clean_bread_name(value: str) -> str:
-            clean = value.replace("(p.)", "").strip()
-            return clean
-
-        def _read_invert_load() -> bool:
-            config_path = base_dir / "config" / "config.txt"
-            if not config_path.exists():
-                return False
-            with config_path.open("r", encoding="utf-8") as handle:
-                for raw_line in handle:
-                    line = raw_line.strip()
-                    if not line or line.startswith("#") or "=" not in line:
-                        continue
-                    key, value = line.split("=", 1)
-                    if key.strip().lower() == "invertload":
-                        return value.strip().lower() == "true"
-            return False
-
-        invert_load = _read_invert_load()
-        box_order = list(reversed(self.boxes)) if invert_load else self.boxes
-
-        def _find_empty_box(required_size: int) -> Optional[Box]:
-            for box in box_order:
-                if box.status == BoxStatus.EMPTY and box.size == required_size:
-                    return box
+        """Remet toutes les boîtes non réservées à l'état EMPTY.
+
+        Les noms des commandes précédentes sont retirés de la table du
+        BoxStore, qui sinon grandirait à chaque chargement.
+        """
+        reserved = STATUS_CODES[BoxStatus.RESERVED]
+        with self.batch():
+            for box_id, status in enumerate(self.store.status):
+                if status != reserved:
+                    self.boxes[box_id].set_status(BoxStatus.EMPTY)
+        self.store.compact_names()
+
+    def load_pains(self, commandes_path: Optional[Path] = None) -> List[Order]:
+        """Charge les pains depuis un CSV de commandes et remplit les boîtes.
+
+        Args:
+            commandes_path: CSV à lire (commandes/commandes.csv par défaut)
+
+        Returns:
+            Les commandes (ou parties de commandes) qui n'ont pas pu être placées
+        """
+        staged = self.stage_pains(commandes_path)
+        if staged is None:
+            return []
+        return self.apply_staged(staged)
+
+    def free_layout(self) -> Tuple[FreeBox, ...]:
+        """Boîtes non réservées dans l'ordre de chargement (thread propriétaire)."""
+        reserved = STATUS_CODES[BoxStatus.RESERVED]
+        store = self.store
+        box_ids = range(self.num_boxes)
+        if self.config_store.get().invert_load:
+            box_ids = reversed(box_ids)
+        return tuple(FreeBox(box_id, store.size[box_id]) for box_id in box_ids if store.status[box_id] != reserved)
+
+    def stage_pains(
+        self,
+        commandes_path: Optional[Path] = None,
+        layout: Optional[Tuple[FreeBox, ...]] = None,
+    ) -> Optional[StagedLoad]:
+        """Prépare le remplissage des boîtes sans les modifier.
+
+        Lit et place les commandes sur les boîtes non réservées. Hors du
+        thread propriétaire du modèle, passer layout (free_layout() relevé
+        dans ce thread): les boîtes ne sont alors pas lues. Retourne None si
+        le fichier n'existe pas.
+        """
+        orders = read_order_file(commandes_path)
+        if orders is None:
             return None
-
-        def _place_small_single(user_name: str, bread_name: str) -> bool:
-            box = _find_empty_box(1)
-            if box is None:
-                box = _find_empty_box(2)
-            if box is None:
-                return False
-            box.set_status(BoxStatus.OCCUPIED, user_name, bread_name)
-            return True
-
-        def _place_small_pair(user_name: str, bread_name: str) -> bool:
-            box = _find_empty_box(2)
-            if box is not None:
-                combined = f"{bread_name}\n{bread_name}"
-                box.set_status(BoxStatus.OCCUPIED, user_name, combined)
-                return True
-            if not _place_small_single(user_name, bread_name):
-                return False
-            if not _place_small_single(user_name, bread_name):
-                return False
-            return True
-
-        in_section = False
-        headers: list[str] | None = None
-        filled_any = False
-
-        with commandes_path.open("r", encoding="utf-8", newline="") as handle:
-            for raw_line in handle:
-                line = raw_line.strip("\n")
-                if not line:
-                    continue
-
-                cells = [_strip_quotes(cell) for cell in line.split(";")]
-                if headers is None:
-                    headers = cells
-                    continue
-                if not in_section:
-                    if any("Boîte à P1s" in cell for cell in cells):
-                        in_section = True
-                    continue
-
-                if any(cell.startswith("Total") for cell in cells if cell):
-                    break
-
-                if len(cells) < 3:
-                    continue
-
-                user_name = cells[0]
-                if not user_name:
-                    continue
-
-                for col_index in range(2, len(cells)):
-                    bread_name = headers[col_index] if col_index < len(headers) else ""
-                    bread_name = _clean_bread_name(bread_name)
-                    qty = _parse_quantity(cells[col_index])
-                    if qty < 1:
-                        continue
-
-                    is_large = "_L" in bread_name
-                    if is_large:
-                        for _ in range(qty):
-                            box = _find_empty_box(2)
-                            if box is None:
-                                return
-                            box.set_status(BoxStatus.OCCUPIED, user_name, bread_name)
-                            filled_any = True
-                        continue
-
-                    pair_count = qty // 2
-                    remainder = qty % 2
-                    for _ in range(pair_count):
-                        if not _place_small_pair(user_name, bread_name):
-                            return
-                        filled_any = True
-                    for _ in range(remainder):
-                        if not _place_small_single(user_name, bread_name):
-                            return
-                        filled_any = True
-
-        if filled_any:
-            self.notify_observers()
+        return self.stage_orders(orders, layout)
+
+    def stage_orders(self, orders: List[Order], layout: Optional[Tuple[FreeBox, ...]] = None) -> StagedLoad:
+        """Prépare le placement de commandes déjà lues (voir stage_pains)."""
+        if layout is None:
+            layout = self.free_layout()
+        result = plan_placement(orders, layout)
+        return StagedLoad(
+            [(box.id, user_name, content) for box, user_name, content in result.assignments],
+            result.unplaced,
+            orders,
+            layout,
+        )
+
+    def capacity(self) -> int:
+        """Nombre de places (une par pain, deux par boîte double) hors boîtes réservées"""
+        reserved = STATUS_CODES[BoxStatus.RESERVED]
+        return sum(
+            size * (sum(counts) - counts[reserved])
+            for size, counts in self.store.counts_by_size().items()
+        )
+
+    def apply_staged(self, staged: StagedLoad) -> List[Order]:
+        """Applique un remplissage préparé par stage_pains (une seule notification).
+
+        Si des boîtes ont été réservées ou redimensionnées depuis la
+        préparation, le placement est refait sur les boîtes actuelles.
+        """
+        with self.batch():
+            self.reset_boxes()
+            if staged.layout != self.free_layout():
+                staged = self.stage_orders(staged.orders)
+            for box_id, user_name, content in staged.assignments:
+                self.boxes[box_id].set_status(BoxStatus.OCCUPIED, user_name, content)
+        return staged.unplaced
 
     def print_pain(self):
         """Affiche le contenu de chaque boîte."""
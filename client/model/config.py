@@ -0,0 +1,253 @@
+"""
+Configuration de l'application (config/config.txt).
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+import threading
+from typing import Callable
+
+
+RESERVED_BOX_KEYS = {"boxnumber", "boxnnumber", "boxnumer"}
+POLL_KEYS = {"pollfast": "poll_fast", "pollslow": "poll_slow", "pollmaxbackoff": "poll_max_backoff"}
+# Valeurs propres à chaque casier (non héritées des valeurs globales)
+LOCKER_FIELDS = {"ip", "port", "reserved_box_id", "push_port", "num_boxes", "grid_rows", "grid_columns"}
+
+
+@dataclass(frozen=True)
+class AppConfig:
+    """Valeurs lues dans config.txt.
+
+    En mode flotte, lockers contient une AppConfig par section [nom] du
+    fichier; chacune hérite des valeurs globales (identifiants, délais...)
+    sauf celles de LOCKER_FIELDS et des tailles de boîtes.
+    """
+
+    name: str = ""
+    ip: str | None = None
+    port: int | None = None
+    email: str = ""
+    password: str = ""
+    debug_mode: bool = False
+    invert_load: bool = False
+    reserved_box_id: int | None = None
+    orders_cache_ttl: float = 300.0
+    prefetch_days: int = 2
+    prefetch_workers: int = 2
+    poll_fast: float = 5.0
+    poll_slow: float = 60.0
+    poll_max_backoff: float = 300.0
+    push_port: int = 0
+    binary_load: bool = False  # trame binaire "B" au lieu de "c-..." (firmware récent)
+    num_boxes: int = 28
+    grid_rows: int = 0  # 0: selon num_boxes et grid_columns
+    grid_columns: int = 4
+    box_sizes: dict[int, int] = field(default_factory=dict)
+    lockers: tuple["AppConfig", ...] = ()
+
+    @property
+    def arduino_address(self) -> tuple[str, int] | None:
+        """Retourne (ip, port) de l'Arduino, ou None si incomplet."""
+        if self.ip and self.port:
+            return (self.ip, self.port)
+        return None
+
+    @property
+    def is_fleet(self) -> bool:
+        return bool(self.lockers)
+
+    def locker(self, name: str) -> "AppConfig":
+        """Retourne la configuration du casier name (self si introuvable)."""
+        for locker in self.lockers:
+            if locker.name == name:
+                return locker
+        return self
+
+    def grid_shape(self, num_boxes: int) -> tuple[int, int]:
+        """Retourne (lignes, colonnes) de la grille d'affichage des boîtes."""
+        columns = max(1, self.grid_columns)
+        rows = max(self.grid_rows, -(-num_boxes // columns))
+        return rows, columns
+
+    def box_sizes_for(self, num_boxes: int) -> list[int]:
+        """Retourne la taille de chaque boîte (1 par défaut)."""
+        sizes = [1] * num_boxes
+        for box_index, size in self.box_sizes.items():
+            if 0 <= box_index < num_boxes:
+                sizes[box_index] = size
+        return sizes
+
+
+def _parse_line(key: str, value: str, values: dict, box_sizes: dict[int, int]):
+    """Interprète une ligne cle=valeur dans values/box_sizes."""
+    if key == "ip":
+        values["ip"] = value
+    elif key == "port":
+        try:
+            values["port"] = int(value)
+        except ValueError:
+            pass
+    elif key == "email":
+        values["email"] = value
+    elif key == "password":
+        values["password"] = value
+    elif key == "debugmode":
+        values.setdefault("debug_mode", value.lower() == "true")
+    elif key == "invertload":
+        values.setdefault("invert_load", value.lower() == "true")
+    elif key == "binaryload":
+        values["binary_load"] = value.lower() == "true"
+    elif key == "orderscachettl":
+        try:
+            values["orders_cache_ttl"] = float(value)
+        except ValueError:
+            pass
+    elif key in ("prefetchdays", "prefetchworkers"):
+        try:
+            values[f"prefetch_{key[8:]}"] = max(0, int(value))
+        except ValueError:
+            pass
+    elif key in POLL_KEYS:
+        try:
+            values[POLL_KEYS[key]] = max(1.0, float(value))
+        except ValueError:
+            pass
+    elif key == "pushport":
+        try:
+            values["push_port"] = max(0, int(value))
+        except ValueError:
+            pass
+    elif key in ("gridrows", "gridcolumns"):
+        try:
+            values[f"grid_{key[4:]}"] = max(0, int(value))
+        except ValueError:
+            pass
+    elif key == "boxes":
+        try:
+            values["num_boxes"] = max(1, int(value))
+        except ValueError:
+            pass
+    elif key in RESERVED_BOX_KEYS:
+        if "reserved_box_id" not in values:
+            try:
+                values["reserved_box_id"] = int(value) - 1
+            except ValueError:
+                values["reserved_box_id"] = None
+    elif key.startswith("box") and key[3:].isdigit():
+        try:
+            size = int(value)
+        except ValueError:
+            return
+        if size in (1, 2):
+            box_sizes[int(key[3:]) - 1] = size
+
+
+def parse_config(config_path: str | Path) -> AppConfig:
+    """Parse config.txt (lignes cle=valeur, # pour les commentaires).
+
+    Une ligne [nom] ouvre la section d'un casier (mode flotte): les lignes
+    suivantes ne s'appliquent qu'à ce casier.
+    """
+    path = Path(config_path)
+    if not path.exists():
+        return AppConfig()
+
+    values: dict = {}
+    box_sizes: dict[int, int] = {}
+    # nom du casier -> (valeurs, tailles de boîtes), dans l'ordre du fichier
+    sections: dict[str, tuple[dict, dict[int, int]]] = {}
+    current = (values, box_sizes)
+
+    with path.open("r", encoding="utf-8") as handle:
+        for raw_line in handle:
+            line = raw_line.strip()
+            if line.startswith("[") and line.endswith("]"):
+                current = sections.setdefault(line[1:-1].strip(), ({}, {}))
+                continue
+            if not line or line.startswith("#") or "=" not in line:
+                continue
+            key, value = line.split("=", 1)
+            _parse_line(key.strip().lower(), value.strip(), *current)
+
+    shared = {key: value for key, value in values.items() if key not in LOCKER_FIELDS}
+    lockers = tuple(
+        AppConfig(name=name, box_sizes=section_sizes, **{**shared, **section_values})
+        for name, (section_values, section_sizes) in sections.items()
+    )
+    return AppConfig(box_sizes=box_sizes, lockers=lockers, **values)
+
+
+class ConfigStore:
+    """Configuration partagée, rechargée seulement si le fichier change.
+
+    Le fichier n'est relu que lorsque sa date de modification ou sa taille
+    changent; les observateurs reçoivent alors la nouvelle AppConfig.
+    """
+
+    def __init__(self, config_path: str | Path | None = None):
+        if config_path is None:
+            base_dir = Path(__file__).resolve().parents[2]
+            config_path = base_dir / "config" / "config.txt"
+        self.path = Path(config_path)
+        self._lock = threading.Lock()
+        self._signature: tuple[int, int] | None = None
+        self._config = AppConfig()
+        self._observers: list[Callable[[AppConfig], None]] = []
+        self._refresh()
+
+    def register_observer(self, callback: Callable[[AppConfig], None]):
+        """Enregistre un observateur appelé quand la configuration change"""
+        self._observers.append(callback)
+
+    def get(self) -> AppConfig:
+        """Retourne la configuration courante (rechargée si modifiée)."""
+        if self._refresh():
+            for callback in self._observers:
+                callback(self._config)
+        return self._config
+
+    def _refresh(self) -> bool:
+        try:
+            stat = self.path.stat()
+            signature = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            signature = None
+
+        with self._lock:
+            if signature == self._signature:
+                return False
+            self._signature = signature
+            self._config = parse_config(self.path) if signature else AppConfig()
+            return True
+
+
+class LockerConfigStore:
+    """Vue d'un ConfigStore limitée à un casier de la flotte.
+
+    Offre la même interface que ConfigStore (get, register_observer): le
+    modèle et le cœur d'un casier l'utilisent sans savoir qu'ils font
+    partie d'une flotte.
+    """
+
+    def __init__(self, store: ConfigStore, name: str):
+        self.store = store
+        self.name = name
+
+    def get(self) -> AppConfig:
+        return self.store.get().locker(self.name)
+
+    def register_observer(self, callback: Callable[[AppConfig], None]):
+        self.store.register_observer(lambda config: callback(config.locker(self.name)))
+
+
+_default_store: ConfigStore | None = None
+
+
+def get_config_store() -> ConfigStore:
+    """Retourne le ConfigStore partagé par le modèle et le contrôleur."""
+    global _default_store
+    if _default_store is None:
+        _default_store = ConfigStore()
+    return _default_store
@@ -0,0 +1,196 @@
+"""
+Stockage des logs de badges (logs/logs_MM_YY.txt).
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from datetime import date, datetime
+from pathlib import Path
+import threading
+
+
+def parse_log_datetime(value: str) -> datetime:
+    """Parse un horodatage "DD/MM/YYYY HH:MM:SS" (sans strptime).
+
+    Lève ValueError si le format n'est pas respecté.
+    """
+    if (
+        len(value) != 19
+        or value[2] != "/" or value[5] != "/" or value[10] != " "
+        or value[13] != ":" or value[16] != ":"
+    ):
+        raise ValueError(f"horodatage invalide: {value!r}")
+    return datetime(
+        int(value[6:10]), int(value[3:5]), int(value[0:2]),
+        int(value[11:13]), int(value[14:16]), int(value[17:19]),
+    )
+
+
+class _MonthIndex:
+    """Index d'un fichier mensuel: plages d'octets (début, fin) par jour."""
+
+    def __init__(self):
+        self.size = 0
+        self.mtime_ns = 0
+        self.days: dict[str, list[list[int]]] = {}
+
+    def add_line(self, day_key: str, start: int, end: int):
+        spans = self.days.setdefault(day_key, [])
+        if spans and spans[-1][1] == start:
+            spans[-1][1] = end
+        else:
+            spans.append([start, end])
+
+
+class LogStore:
+    """Logs de badges par fichier mensuel, avec un index par jour.
+
+    Chaque fichier est parcouru une seule fois pour construire l'index
+    (jour "DD/MM/YYYY" -> plages d'octets); l'index est ensuite complété à
+    chaque ajout, si bien que charger un jour ne lit que ses propres lignes.
+
+    Les jours déjà chargés sont gardés en cache (LRU): un ajout les complète
+    sur place, une modification externe du fichier les invalide.
+    """
+
+    def __init__(self, logs_dir: str | Path | None = None, cache_size: int = 31):
+        if logs_dir is None:
+            base_dir = Path(__file__).resolve().parents[2]
+            logs_dir = base_dir / "logs"
+        self.logs_dir = Path(logs_dir)
+        self.cache_size = cache_size
+        self._indexes: dict[Path, _MonthIndex] = {}
+        # date -> (taille, mtime de l'index au chargement, logs du jour)
+        self._day_cache: OrderedDict[date, tuple[int, int, list[tuple[datetime, str]]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def month_path(self, day: date) -> Path:
+        """Chemin du fichier de logs du mois de day."""
+        return self.logs_dir / f"logs_{day.strftime('%m_%y')}.txt"
+
+    def append(self, entries: list[tuple[datetime, str]]):
+        """Ajoute des logs (datetime, nom_client) dans leurs fichiers mensuels."""
+        grouped: dict[Path, list[tuple[datetime, str]]] = {}
+        for log_datetime, client_name in entries:
+            grouped.setdefault(self.month_path(log_datetime.date()), []).append(
+                (log_datetime, client_name)
+            )
+
+        self.logs_dir.mkdir(exist_ok=True)
+        with self._lock:
+            for path, month_entries in grouped.items():
+                index = self._get_index(path)
+                previous = (index.size, index.mtime_ns)
+                with path.open("ab") as handle:
+                    offset = handle.tell()
+                    for log_datetime, client_name in month_entries:
+                        line = f"{log_datetime.strftime('%d/%m/%Y %H:%M:%S')};{client_name}\n"
+                        data = line.encode("utf-8")
+                        handle.write(data)
+                        index.add_line(line[:10], offset, offset + len(data))
+                        offset += len(data)
+                self._mark_indexed(path, index, offset)
+                self._update_cache(path, previous, index, month_entries)
+
+    def load_day(self, day: date) -> list[tuple[datetime, str]]:
+        """Retourne les logs (datetime, nom_client) d'un jour, dans l'ordre du fichier."""
+        path = self.month_path(day)
+        day_key = day.strftime("%d/%m/%Y")
+        logs: list[tuple[datetime, str]] = []
+
+        with self._lock:
+            if not path.exists():
+                self._indexes.pop(path, None)
+                self._day_cache.pop(day, None)
+                return logs
+            index = self._get_index(path)
+
+            cached = self._day_cache.get(day)
+            if cached is not None and cached[:2] == (index.size, index.mtime_ns):
+                self._day_cache.move_to_end(day)
+                return list(cached[2])
+
+            with path.open("rb") as handle:
+                for start, end in index.days.get(day_key, []):
+                    handle.seek(start)
+                    chunk = handle.read(end - start).decode("utf-8", errors="replace")
+                    for line in chunk.splitlines():
+                        line = line.strip()
+                        if not line or ";" not in line:
+                            continue
+                        try:
+                            datetime_str, client_name = line.split(";", 1)
+                            logs.append((parse_log_datetime(datetime_str.strip()), client_name.strip()))
+                        except ValueError as e:
+                            print(f"Erreur lors de la lecture de la ligne '{line}': {e}")
+
+            self._day_cache[day] = (index.size, index.mtime_ns, logs)
+            self._day_cache.move_to_end(day)
+            while len(self._day_cache) > self.cache_size:
+                self._day_cache.popitem(last=False)
+
+        return list(logs)
+
+    def _update_cache(
+        self,
+        path: Path,
+        previous: tuple[int, int],
+        index: _MonthIndex,
+        entries: list[tuple[datetime, str]],
+    ):
+        """Complète sur place les jours en cache après un ajout (sous verrou).
+
+        Seuls les jours qui étaient à jour avant l'ajout sont conservés.
+        """
+        for day in [d for d in self._day_cache if self.month_path(d) == path]:
+            size, mtime_ns, logs = self._day_cache[day]
+            if (size, mtime_ns) != previous:
+                del self._day_cache[day]
+                continue
+            logs.extend(entry for entry in entries if entry[0].date() == day)
+            self._day_cache[day] = (index.size, index.mtime_ns, logs)
+
+    def _get_index(self, path: Path) -> _MonthIndex:
+        """Retourne l'index à jour d'un fichier (appelé sous verrou).
+
+        Si le fichier a grandi depuis la dernière indexation (écriture
+        externe), seule la fin est indexée; s'il a été réécrit, tout est
+        réindexé.
+        """
+        index = self._indexes.get(path)
+        try:
+            stat = path.stat()
+        except OSError:
+            index = _MonthIndex()
+            self._indexes[path] = index
+            return index
+
+        if index is not None and stat.st_size == index.size and stat.st_mtime_ns == index.mtime_ns:
+            return index
+        if index is None or stat.st_size <= index.size:
+            index = _MonthIndex()
+            self._indexes[path] = index
+
+        with path.open("rb") as handle:
+            handle.seek(index.size)
+            offset = index.size
+            for raw_line in handle:
+                end = offset + len(raw_line)
+                if raw_line.endswith(b"\n"):
+                    day_key = raw_line[:10].decode("ascii", errors="replace")
+                    index.add_line(day_key, offset, end)
+                    offset = end
+                else:
+                    # Ligne en cours d'écriture: sera indexée au prochain passage
+                    break
+        self._mark_indexed(path, index, offset)
+        return index
+
+    def _mark_indexed(self, path: Path, index: _MonthIndex, size: int):
+        index.size = size
+        try:
+            stat = path.stat()
+            index.mtime_ns = stat.st_mtime_ns if stat.st_size == size else 0
+        except OSError:
+            index.mtime_ns = 0
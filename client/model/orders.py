@@ -0,0 +1,141 @@
+"""
+Commandes de pains (commandes/commandes.csv).
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator
+import csv
+import hashlib
+import threading
+
+
+SECTION_MARKER = "Boîte à P1s"
+
+
+@dataclass(frozen=True)
+class Order:
+    """Ligne de commande: quantité d'un pain pour un utilisateur."""
+
+    user: str
+    bread: str
+    qty: int
+    is_large: bool = False
+
+
+def _parse_quantity(value: str) -> int:
+    clean = value.strip().replace(",", ".")
+    if not clean:
+        return 0
+    try:
+        qty = int(float(clean))
+    except ValueError:
+        return 0
+    return qty if qty >= 1 else 0
+
+
+def _clean_bread_name(value: str) -> str:
+    return value.replace("(p.)", "").strip()
+
+
+def iter_orders(lines: Iterable[str]) -> Iterator[Order]:
+    """Parse l'export CSV (séparateur ';') ligne à ligne.
+
+    La première ligne donne les noms de pains (nettoyés une seule fois);
+    seules les lignes de la section "Boîte à P1s" sont lues, jusqu'à la
+    ligne "Total".
+    """
+    columns: list[tuple[str, bool]] | None = None
+    in_section = False
+
+    for cells in csv.reader(lines, delimiter=";", skipinitialspace=True):
+        if not cells:
+            continue
+        if columns is None:
+            breads = [_clean_bread_name(cell) for cell in cells]
+            columns = [(bread, "_L" in bread) for bread in breads]
+            continue
+        if not in_section:
+            if any(SECTION_MARKER in cell for cell in cells):
+                in_section = True
+            continue
+
+        cells = [cell.strip() for cell in cells]
+        if any(cell.startswith("Total") for cell in cells if cell):
+            break
+        if len(cells) < 3:
+            continue
+
+        user_name = cells[0]
+        if not user_name:
+            continue
+
+        for col_index in range(2, len(cells)):
+            value = cells[col_index]
+            if not value:
+                continue
+            qty = _parse_quantity(value)
+            if qty < 1:
+                continue
+            bread, is_large = columns[col_index] if col_index < len(columns) else ("", False)
+            yield Order(user_name, bread, qty, is_large)
+
+
+class OrderFileCache:
+    """Résultats de parsing indexés par empreinte (SHA-1) du fichier."""
+
+    def __init__(self, max_entries: int = 16):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, list[Order]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    CHUNK_SIZE = 64 * 1024
+
+    def read(self, path: str | Path) -> list[Order]:
+        """Retourne les commandes d'un fichier, sans reparser un contenu connu.
+
+        L'empreinte est calculée par blocs; en cas d'absence du cache, le
+        fichier est parsé directement depuis le fichier ouvert (newline="",
+        nécessaire à csv pour les champs sur plusieurs lignes).
+        """
+        path = Path(path)
+        sha1 = hashlib.sha1()
+        with path.open("rb") as file:
+            for chunk in iter(lambda: file.read(self.CHUNK_SIZE), b""):
+                sha1.update(chunk)
+        digest = sha1.hexdigest()
+        with self._lock:
+            orders = self._entries.get(digest)
+            if orders is not None:
+                self._entries.move_to_end(digest)
+                return list(orders)
+
+        with path.open(newline="", encoding="utf-8") as file:
+            orders = list(iter_orders(file))
+        with self._lock:
+            self._entries[digest] = orders
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return list(orders)
+
+
+_default_cache = OrderFileCache()
+
+
+def read_orders(path: str | Path) -> list[Order]:
+    """Lit les commandes d'un fichier CSV (cache partagé par empreinte)."""
+    return _default_cache.read(path)
+
+
+def read_order_file(path: str | Path | None = None) -> list[Order] | None:
+    """Lit commandes/commandes.csv (ou path); None si le fichier n'existe pas."""
+    if path is None:
+        base_dir = Path(__file__).resolve().parents[2]
+        path = base_dir / "commandes" / "commandes.csv"
+    path = Path(path)
+    if not path.exists():
+        return None
+    return read_orders(path) if path.stat().st_size else []
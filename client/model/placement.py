@@ -0,0 +1,142 @@
+"""
+Placement des pains commandés dans les boîtes.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Iterable, TYPE_CHECKING
+
+from model.orders import Order
+
+if TYPE_CHECKING:
+    from model.bread_box_model import Box
+
+
+class FreeBoxPools:
+    """Boîtes libres regroupées par taille, dans l'ordre de chargement."""
+
+    def __init__(self, boxes: Iterable["Box"]):
+        self._pools: dict[int, deque] = {1: deque(), 2: deque()}
+        for box in boxes:
+            self._pools.setdefault(box.size, deque()).append(box)
+
+    def count(self, size: int) -> int:
+        return len(self._pools.get(size, ()))
+
+    def pop(self, size: int) -> "Box | None":
+        pool = self._pools.get(size)
+        return pool.popleft() if pool else None
+
+
+@dataclass
+class PlacementResult:
+    """Résultat du placement: (boîte, utilisateur, contenu) et restes."""
+
+    assignments: list[tuple["Box", str, str]] = field(default_factory=list)
+    unplaced: list[Order] = field(default_factory=list)
+
+
+def _best_split(n1: int, n2: int, large: int, pairs: int, small_units: int) -> tuple[int, int]:
+    """Choisit combien de gros pains et de paires vont en boîtes doubles.
+
+    Maximise le nombre de pains placés (à égalité, privilégie les gros
+    pains, qui ne tiennent que dans une boîte double).
+    """
+    best = (-1, 0, 0)
+    for large_placed in range(min(large, n2) + 1):
+        free2 = n2 - large_placed
+        pairs_placed = min(pairs, free2)
+        remaining = small_units - 2 * pairs_placed
+        singles_placed = min(remaining, n1 + free2 - pairs_placed)
+        total = large_placed + 2 * pairs_placed + singles_placed
+        if total >= best[0]:
+            best = (total, large_placed, pairs_placed)
+    return best[1], best[2]
+
+
+def split_orders(orders: list[Order], capacities: list[int]) -> list[list[Order]]:
+    """Répartit les commandes entre plusieurs casiers selon leur capacité.
+
+    Les commandes d'un même utilisateur restent dans le même casier. Les
+    utilisateurs sont pris par demande décroissante (un gros pain compte
+    pour deux places) et vont au casier qui a le plus de places libres.
+    L'ordre du fichier est conservé dans chaque casier.
+    """
+    if not capacities:
+        return []
+
+    by_user: dict[str, list[int]] = {}
+    for index, order in enumerate(orders):
+        by_user.setdefault(order.user, []).append(index)
+
+    def demand(indexes: list[int]) -> int:
+        return sum(orders[i].qty * (2 if orders[i].is_large else 1) for i in indexes)
+
+    remaining = list(capacities)
+    shares: list[list[int]] = [[] for _ in capacities]
+    for indexes in sorted(by_user.values(), key=demand, reverse=True):
+        target = max(range(len(remaining)), key=lambda i: remaining[i])
+        shares[target].extend(indexes)
+        remaining[target] -= demand(indexes)
+
+    return [[orders[i] for i in sorted(share)] for share in shares]
+
+
+def plan_placement(orders: list[Order], free_boxes: Iterable["Box"]) -> PlacementResult:
+    """Répartit les commandes dans les boîtes libres (sans modifier les boîtes).
+
+    - un gros pain (_L) occupe une boîte double;
+    - deux petits pains identiques d'un même utilisateur partagent une
+      boîte double;
+    - les autres petits pains vont en boîte simple, puis en boîte double.
+    """
+    pools = FreeBoxPools(free_boxes)
+    result = PlacementResult()
+
+    large_total = sum(order.qty for order in orders if order.is_large)
+    small_orders = [order for order in orders if not order.is_large]
+    pairs_total = sum(order.qty // 2 for order in small_orders)
+    small_units = sum(order.qty for order in small_orders)
+    large_budget, pairs_budget = _best_split(
+        pools.count(1), pools.count(2), large_total, pairs_total, small_units
+    )
+
+    # Pains non placés par indice de commande (deux commandes identiques
+    # sont des valeurs égales: elles ne doivent pas partager un compteur)
+    missing: dict[int, int] = {}
+
+    for index, order in enumerate(orders):
+        if not order.is_large:
+            continue
+        placed = min(order.qty, large_budget)
+        large_budget -= placed
+        for _ in range(placed):
+            result.assignments.append((pools.pop(2), order.user, order.bread))
+        if placed < order.qty:
+            missing[index] = order.qty - placed
+
+    singles: list[int] = []
+    for index, order in enumerate(orders):
+        if order.is_large:
+            continue
+        pairs = min(order.qty // 2, pairs_budget)
+        pairs_budget -= pairs
+        for _ in range(pairs):
+            result.assignments.append((pools.pop(2), order.user, f"{order.bread}\n{order.bread}"))
+        singles.extend([index] * (order.qty - 2 * pairs))
+
+    for index in singles:
+        order = orders[index]
+        box = pools.pop(1) or pools.pop(2)
+        if box is None:
+            missing[index] = missing.get(index, 0) + 1
+            continue
+        result.assignments.append((box, order.user, order.bread))
+
+    result.unplaced = [
+        Order(orders[index].user, orders[index].bread, qty, orders[index].is_large)
+        for index, qty in missing.items()
+    ]
+    return result
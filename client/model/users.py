@@ -37,13 +37,69 @@ def read_badges(csv_path: str | Path) -> list[Badge]:
     return badges
 
 
+def normalize_name(name: str) -> str:
+    """Forme canonique d'un nom pour les comparaisons (casse/espaces)."""
+    return name.strip().lower()
+
+
 class Badgelist:
-    """Conteneur de badges chargee depuis un CSV."""
+    """Annuaire de badges charge depuis un CSV.
+
+    Les badges sont indexes par code hexadecimal, par code decimal (format
+    des logs Arduino) et par nom normalise, pour des recherches en O(1).
+    """
+
+    def __init__(self, csv_path: str | Path | None = None):
+        if csv_path is None:
+            base_dir = Path(__file__).resolve().parents[2]
+            csv_path = base_dir / "badges" / "badges.csv"
+        self.badges = read_badges(csv_path)
+        self._build_index()
+
+    def _build_index(self):
+        """Construit les index a partir de self.badges.
+
+        En cas de doublon, le premier badge du CSV l'emporte (comme l'ancien
+        parcours lineaire).
+        """
+        self._by_hex: dict[str, Badge] = {}
+        self._by_decimal: dict[int, Badge] = {}
+        self._by_name: dict[str, list[Badge]] = {}
+
+        for badge in self.badges:
+            code = badge.code.upper()
+            self._by_hex.setdefault(code, badge)
+            try:
+                self._by_decimal.setdefault(int(code, 16), badge)
+            except ValueError:
+                pass
+            if badge.name:
+                self._by_name.setdefault(normalize_name(badge.name), []).append(badge)
+
+        self._sorted_names = sorted({badge.name for badge in self.badges if badge.name})
+
+    def find_by_hex(self, code: str) -> Badge | None:
+        """Retourne le badge correspondant a un code hexadecimal."""
+        return self._by_hex.get(code.strip().upper())
+
+    def find_by_decimal(self, value: int | str) -> Badge | None:
+        """Retourne le badge correspondant a un code decimal (logs Arduino)."""
+        try:
+            return self._by_decimal.get(int(value))
+        except ValueError:
+            return None
+
+    def find_by_name(self, name: str) -> list[Badge]:
+        """Retourne les badges d'un utilisateur, dans l'ordre du CSV."""
+        return self._by_name.get(normalize_name(name), [])
+
+    def codes_for_name(self, name: str, limit: int = 2) -> list[str]:
+        """Retourne les codes (hexa, majuscules) des badges d'un utilisateur."""
+        return [badge.code.upper() for badge in self.find_by_name(name)[:limit]]
 
-    def __init__(self):
-        base_dir = Path(__file__).resolve().parents[2]
-        badges_path = base_dir / "badges" / "badges.csv"
-        self.badges = read_badges(badges_path)
+    def sorted_names(self) -> list[str]:
+        """Retourne la liste triee des noms d'utilisateurs (sans doublons)."""
+        return self._sorted_names
 
     def print_badges(self):
         for badge in self.badges:
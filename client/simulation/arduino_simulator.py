@@ -0,0 +1,319 @@
+"""
+Simulateur de l'Arduino des boîtes à pain (protocole de p1s_arduino.ino).
+
+Utilisation autonome (depuis client/):
+    python -m simulation.arduino_simulator --port 8080 --latency 0.05
+"""
+
+from __future__ import annotations
+
+import argparse
+from datetime import datetime
+import random
+import socket
+import threading
+import time
+
+from controller.load_frame import FRAME_START, decode_load_frame, frame_size
+
+
+# Délai de lecture d'une trame "B" (FRAME_TIMEOUT du sketch, en secondes)
+FRAME_TIMEOUT = 1.0
+
+class ArduinoSimulator:
+    """Reproduit le protocole TCP de p1s_arduino.ino sur un port local.
+
+    - commandes terminées par '.', réponse terminée par une ligne "OK";
+    - "" (test), "l<position>", "r", "a", "c-XXXXXXXX,YYYYYYYY-...", "o<n>"
+      "p<port>" (abonnement UDP aux badges) et la trame binaire "B";
+    - un seul client à la fois: une nouvelle connexion remplace la session
+      courante, comme sur l'Arduino;
+    - journal datalog.txt en mémoire, avec la même rotation que log_card.
+
+    latency est ajoutée avant chaque réponse (temps de traitement et
+    WiFi de l'Arduino). tag_writes compte les enregistrements de tags.bin
+    réécrits (saveUsers ne réécrit que les casiers modifiés).
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        nb_casiers: int = 28,
+        latency: float = 0.0,
+        max_file_size: int = 3000,
+        max_file_size_hard: int = 64000,
+    ):
+        self.nb_casiers = nb_casiers
+        self.latency = latency
+        self.max_file_size = max_file_size
+        self.max_file_size_hard = max_file_size_hard
+        self.cmd_buffer_size = 16 + nb_casiers * 18
+
+        self.tags = [0] * nb_casiers
+        self.tags_secondaires = [0] * nb_casiers
+        self.opened: list[int] = []     # casiers ouverts, dans l'ordre
+        self.commands: list[str] = []   # commandes reçues, dans l'ordre
+        self.connections = 0            # nombre de connexions acceptées
+        self.tag_writes = 0             # enregistrements de tags.bin réécrits
+
+        self.log_base = 0
+        self.log_acked = 0
+        self._log = bytearray()
+        self._push: tuple[str, int] | None = None
+        self._push_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+        self._lock = threading.Lock()
+        self._server = socket.create_server((host, port))
+        self._server.settimeout(0.5)
+        self.address: tuple[str, int] = self._server.getsockname()[:2]
+        self._client: socket.socket | None = None
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    # ------------------------------------------------------------------
+    # Cycle de vie
+    # ------------------------------------------------------------------
+    def start(self) -> "ArduinoSimulator":
+        self._thread = threading.Thread(target=self._accept_loop, name="arduino-sim", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+        with self._lock:
+            self._drop_client()
+        self._server.close()
+        self._push_sock.close()
+
+    def __enter__(self) -> "ArduinoSimulator":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # ------------------------------------------------------------------
+    # Badges (lecteur RFID)
+    # ------------------------------------------------------------------
+    def badge(self, key: int, when: datetime | None = None):
+        """Simule le passage d'un badge (card_check puis log_card)."""
+        with self._lock:
+            for i in range(self.nb_casiers):
+                if key in (self.tags[i], self.tags_secondaires[i]):
+                    self.opened.append(i)
+            self._log_card(key, when or datetime.now())
+
+    def seed_logs(self, count: int, keys: list[int] | None = None):
+        """Ajoute count badges au journal (sans ouvrir de casier)."""
+        keys = keys or [random.getrandbits(32) for _ in range(16)]
+        with self._lock:
+            for i in range(count):
+                self._log_card(keys[i % len(keys)], datetime.now())
+
+    @property
+    def log_end(self) -> int:
+        """Position absolue de la fin du journal."""
+        with self._lock:
+            return self.log_base + len(self._log)
+
+    def _log_card(self, key: int, when: datetime):
+        size = len(self._log)
+        acked = self.log_acked >= self.log_base + size
+        if (size > self.max_file_size and acked) or size > self.max_file_size_hard:
+            self._remove_logs()
+
+        line = f"{key};{when.strftime('%H:%M:%S')}".encode("ascii")
+        position = self.log_base + len(self._log)
+        self._log += line + b"\r\n"
+
+        if self._push is not None:
+            datagram = f"E{position}\n".encode("ascii") + line + b"\r\n"
+            try:
+                self._push_sock.sendto(datagram, self._push)
+            except OSError:
+                pass
+
+    def _remove_logs(self):
+        self.log_base += len(self._log)
+        self._log.clear()
+
+    # ------------------------------------------------------------------
+    # Protocole TCP
+    # ------------------------------------------------------------------
+    def handle_command(self, cmd: str, peer_ip: str = "127.0.0.1") -> bytes:
+        """Exécute une commande (sans le '.') et retourne la réponse complète."""
+        with self._lock:
+            self.commands.append(cmd)
+            reply = b""
+            if cmd.startswith("l"):
+                reply = self._send_logs(_atoi(cmd[1:]) if len(cmd) > 1 else self.log_base)
+            elif cmd.startswith("r"):
+                self._remove_logs()
+            elif cmd.startswith("a"):
+                self.opened.extend(i for i in range(self.nb_casiers) if self.tags[i] != 0)
+            elif cmd.startswith("c"):
+                self._load_casiers(cmd[1:])
+            elif cmd.startswith("o"):
+                box = _atoi(cmd[1:])
+                if 0 <= box < self.nb_casiers:
+                    self.opened.append(box)
+            elif cmd.startswith("p"):
+                port = _atoi(cmd[1:])
+                self._push = (peer_ip, port) if port else None
+            return reply + b"OK\r\n"
+
+    def handle_frame(self, frame: bytes) -> bytes:
+        """Exécute une trame "B" (sans le '.') et retourne la réponse complète."""
+        with self._lock:
+            try:
+                tags = decode_load_frame(frame)
+            except ValueError as e:
+                self.commands.append("B")
+                return f"ERR {e}\r\nOK\r\n".encode("ascii", errors="replace")
+            self.commands.append(f"B{len(tags)}")
+            if len(tags) > self.nb_casiers:
+                return b"ERR trop de casiers\r\nOK\r\n"
+            tags += [(0, 0)] * (self.nb_casiers - len(tags))
+            self._save_tags([primary for primary, _ in tags], [secondary for _, secondary in tags])
+            return b"OK\r\n"
+
+    def _send_logs(self, start_from: int) -> bytes:
+        size = len(self._log)
+        start = 0
+        if self.log_base <= start_from <= self.log_base + size:
+            start = start_from - self.log_base
+            self.log_acked = start_from
+        header = f"L{size - start}@{self.log_base + start}/{self.log_base}\r\n".encode("ascii")
+        return header + bytes(self._log[start:])
+
+    def _save_tags(self, tags: list[int], tags_secondaires: list[int]):
+        """Remplace les badges et compte les casiers modifiés (saveUsers)."""
+        self.tag_writes += sum(
+            1 for i in range(self.nb_casiers)
+            if (tags[i], tags_secondaires[i]) != (self.tags[i], self.tags_secondaires[i])
+        )
+        self.tags = tags
+        self.tags_secondaires = tags_secondaires
+
+    def _load_casiers(self, data: str):
+        tags = [0] * self.nb_casiers
+        tags_secondaires = [0] * self.nb_casiers
+        count = 0
+        pos = 0
+        while pos + 9 <= len(data) and data[pos] in "-,":
+            try:
+                value = int(data[pos + 1:pos + 9], 16)
+            except ValueError:
+                value = 0
+            if data[pos] == ",":
+                if count > 0:
+                    tags_secondaires[count - 1] = value
+            elif count < self.nb_casiers:
+                tags[count] = value
+                count += 1
+            pos += 9
+        self._save_tags(tags, tags_secondaires)
+
+    def _accept_loop(self):
+        while not self._stopped.is_set():
+            try:
+                conn, _ = self._server.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            # Réponses envoyées sans attendre l'ACK de la précédente (Nagle),
+            # sinon les commandes en pipeline attendent l'ACK retardé
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            with self._lock:
+                # Un nouveau client remplace la session courante
+                self._drop_client()
+                self._client = conn
+                self.connections += 1
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _drop_client(self):
+        if self._client is not None:
+            try:
+                self._client.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._client.close()
+            self._client = None
+
+    def _serve(self, conn: socket.socket):
+        peer_ip = conn.getpeername()[0]
+        buffer = bytearray()
+        frame = None  # trame "B" en cours de réception (taille fixe)
+        while not self._stopped.is_set():
+            # Trame incomplète après FRAME_TIMEOUT: session fermée sans
+            # réponse, comme readBytes dans le sketch
+            try:
+                conn.settimeout(FRAME_TIMEOUT if frame is not None else None)
+                data = conn.recv(4096)
+            except OSError:
+                break
+            if not data:
+                break
+            for byte in data:
+                reply = None
+                if frame is not None:
+                    frame.append(byte)
+                    # "B", nombre de casiers (uint16), casiers, CRC puis '.'
+                    if len(frame) >= 3 and len(frame) == frame_size(int.from_bytes(frame[1:3], "little")) + 1:
+                        reply = self.handle_frame(bytes(frame[:-1])) if frame[-1] == ord(".") else (
+                            b"ERR fin de trame manquante\r\nOK\r\n"
+                        )
+                        frame = None
+                elif byte == FRAME_START[0] and not buffer:
+                    frame = bytearray((byte,))
+                elif byte == ord("."):
+                    reply = self.handle_command(buffer.decode("ascii", errors="replace"), peer_ip)
+                    buffer.clear()
+                elif byte not in (ord("\r"), ord("\n")) and len(buffer) < self.cmd_buffer_size - 1:
+                    buffer.append(byte)
+                if reply is not None:
+                    if self.latency:
+                        time.sleep(self.latency)
+                    try:
+                        conn.sendall(reply)
+                    except OSError:
+                        return
+        with self._lock:
+            if self._client is conn:
+                self._drop_client()
+
+
+def _atoi(value: str) -> int:
+    """Équivalent de atoi/strtoul: chiffres de tête, 0 sinon."""
+    digits = ""
+    for char in value.strip():
+        if not char.isdigit():
+            break
+        digits += char
+    return int(digits) if digits else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulateur de l'Arduino des boîtes à pain")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0, help="délai avant chaque réponse (s)")
+    parser.add_argument("--boxes", type=int, default=28)
+    parser.add_argument("--log-lines", type=int, default=0, help="badges déjà présents dans le journal")
+    args = parser.parse_args()
+
+    with ArduinoSimulator(args.host, args.port, args.boxes, args.latency) as simulator:
+        simulator.seed_logs(args.log_lines)
+        print(f"Simulateur Arduino en écoute sur {simulator.address[0]}:{simulator.address[1]}")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
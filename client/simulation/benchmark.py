@@ -0,0 +1,208 @@
+"""
+Banc de mesure bout en bout contre le simulateur d'Arduino.
+
+Utilisation (depuis client/):
+    python -m simulation.benchmark --latency 0.02 --commands 200 --log-lines 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import socket
+import tempfile
+import threading
+import time
+
+from model.bread_box_model import BoxStatus
+from model.config import ConfigStore
+from model.log_store import LogStore
+from model.users import Badgelist
+from controller.arduino_connection import ArduinoConnection
+from controller.locker_core import LockerCore
+from simulation.arduino_simulator import ArduinoSimulator
+
+
+class _TimedLoop:
+    """Remplace root.after: exécute la tâche tout de suite et mesure sa durée.
+
+    Le total correspond au temps pendant lequel le thread Tk aurait été
+    bloqué.
+    """
+
+    def __init__(self):
+        self.durations: list[float] = []
+        self._lock = threading.Lock()
+
+    def call_soon(self, callback, *args):
+        start = time.perf_counter()
+        callback(*args)
+        with self._lock:
+            self.durations.append(time.perf_counter() - start)
+
+
+def make_core(work_dir: Path, num_boxes: int) -> tuple[LockerCore, _TimedLoop]:
+    """LockerCore sans interface, avec ses fichiers dans work_dir."""
+    loop = _TimedLoop()
+    config_store = ConfigStore(work_dir / "config.txt")
+    core = LockerCore(
+        call_soon=loop.call_soon,
+        config_store=config_store,
+        badge_list=Badgelist(work_dir / "badges.csv"),
+        log_store=LogStore(work_dir / "logs"),
+        log_cursor_path=work_dir / "arduino_cursor.txt",
+        num_boxes=num_boxes,
+    )
+    return core, loop
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _report(label: str, durations: list[float]):
+    ms = [d * 1000 for d in durations]
+    print(
+        f"{label:<38} p50 {percentile(ms, 50):8.2f} ms   p99 {percentile(ms, 99):8.2f} ms"
+        f"   ({len(ms)} mesures)"
+    )
+
+
+def _write_fixtures(work_dir: Path, address: tuple[str, int], num_boxes: int) -> list[int]:
+    """Écrit config.txt et badges.csv, retourne les badges (décimal)."""
+    (work_dir / "config.txt").write_text(
+        f"ip={address[0]}\nport={address[1]}\ndebugmode=true\n", encoding="utf-8"
+    )
+    codes = [0x10000000 + i for i in range(num_boxes)]
+    lines = ["Numero;ID;Nom"] + [f"{i + 1};{code:08X};Client {i + 1}" for i, code in enumerate(codes)]
+    (work_dir / "badges.csv").write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return codes
+
+
+def _send_legacy_command(address: tuple[str, int], message: str, timeout: float = 5.0) -> str:
+    """Ancien mode de référence: une connexion TCP par commande.
+
+    Sert seulement de point de comparaison; l'application passe par
+    ArduinoConnection.
+    """
+    with socket.create_connection(address, timeout=timeout) as sock:
+        sock.sendall(message.encode("ascii") + b".")
+        return sock.recv(256).decode("ascii", errors="ignore")
+
+
+def bench_commands(simulator: ArduinoSimulator, count: int):
+    """Latence des commandes: session persistante, pipeline et ancien mode."""
+    connection = ArduinoConnection(*simulator.address)
+    try:
+        durations = []
+        for i in range(count):
+            start = time.perf_counter()
+            success, response = connection.request(f"o{i % simulator.nb_casiers}")
+            durations.append(time.perf_counter() - start)
+            if not success:
+                raise RuntimeError(response)
+        _report("commande (session persistante)", durations)
+
+        start = time.perf_counter()
+        futures = [connection.submit(f"o{i % simulator.nb_casiers}") for i in range(count)]
+        results = [future.result() for future in futures]
+        elapsed = time.perf_counter() - start
+        failures = sum(1 for success, _ in results if not success)
+        print(
+            f"{'commandes en file (pipeline)':<38} {count / elapsed:8.1f} cmd/s"
+            f"   ({failures} refusées, file bornée)"
+        )
+    finally:
+        connection.close()
+
+    durations = []
+    for i in range(count):
+        start = time.perf_counter()
+        _send_legacy_command(simulator.address, f"o{i % simulator.nb_casiers}")
+        durations.append(time.perf_counter() - start)
+    _report("commande (une connexion par commande)", durations)
+
+
+def bench_log_sync(simulator: ArduinoSimulator, core: LockerCore, log_lines: int, codes: list[int]):
+    """Débit de récupération des logs ("l<curseur>") jusqu'à la fin du journal."""
+    simulator.seed_logs(log_lines, codes)
+    target = simulator.log_end
+    rounds = 0
+    start = time.perf_counter()
+    while core._read_log_cursor() < target and rounds < 1000:
+        core.fetch_logs()
+        rounds += 1
+    elapsed = time.perf_counter() - start
+    print(f"{'synchronisation des logs':<38} {log_lines / elapsed:8.0f} lignes/s   ({rounds} requêtes)")
+
+
+def bench_parser(core: LockerCore, log_lines: int, codes: list[int]):
+    """Débit du parseur de logs (parsing + écriture dans le LogStore)."""
+    logs_data = "".join(f"{codes[i % len(codes)]};08:{(i // 60) % 60:02d}:{i % 60:02d}\r\n" for i in range(log_lines))
+    start = time.perf_counter()
+    parsed = core.parse_and_save_logs(logs_data)
+    elapsed = time.perf_counter() - start
+    print(f"{'parseur de logs':<38} {len(parsed) / elapsed:8.0f} lignes/s")
+
+
+def bench_load_command(simulator: ArduinoSimulator, core: LockerCore, repeat: int):
+    """Chargement des casiers: commande texte "c-..." et trame binaire "B"."""
+    with core.model.batch():
+        for box in core.model.boxes:
+            box.set_status(BoxStatus.OCCUPIED, f"Client {box.id + 1}", "Pain")
+    connection = ArduinoConnection(*simulator.address)
+    try:
+        for label, build in (("commande c", core.build_load_command), ("trame B", core.build_load_frame)):
+            durations = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                build()
+                durations.append(time.perf_counter() - start)
+            _report(f"construction ({label})", durations)
+
+            message = build()
+            durations = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                success, response = connection.request(message)
+                durations.append(time.perf_counter() - start)
+                if not success or response:
+                    raise RuntimeError(response)
+            _report(f"chargement ({label}, {len(message) + 1} octets)", durations)
+    finally:
+        connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Banc de mesure contre le simulateur d'Arduino")
+    parser.add_argument("--latency", type=float, default=0.0, help="délai simulé par commande (s)")
+    parser.add_argument("--commands", type=int, default=200)
+    parser.add_argument("--log-lines", type=int, default=5000)
+    parser.add_argument("--boxes", type=int, default=28)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp, ArduinoSimulator(
+        nb_casiers=args.boxes, latency=args.latency, max_file_size_hard=1 << 30
+    ) as simulator:
+        work_dir = Path(tmp)
+        codes = _write_fixtures(work_dir, simulator.address, args.boxes)
+        core, loop = make_core(work_dir, args.boxes)
+        try:
+            bench_commands(simulator, args.commands)
+            bench_log_sync(simulator, core, args.log_lines, codes)
+            bench_parser(core, args.log_lines, codes)
+            bench_load_command(simulator, core, args.commands)
+        finally:
+            core.stop()
+
+        ui = loop.durations
+        if ui:
+            _report("blocage du thread Tk (par callback)", ui)
+            print(f"{'blocage du thread Tk (total)':<38} {sum(ui) * 1000:8.2f} ms")
+        print(f"{'connexions acceptées par le simulateur':<38} {simulator.connections:8d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Tests de OrderClient contre un serveur HTTP local (remplace admin.souke.fr).
+
+Utilisation (depuis la racine du dépôt ou client/):
+    python -m pytest
+"""
+
+from __future__ import annotations
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import tempfile
+import threading
+import time
+import unittest
+from urllib.parse import parse_qs, urlparse
+
+from controller.network_utils import OrderClient
+from model.config import AppConfig
+
+
+CSV = "Nom;;Baguette\nBoîte à P1s;;\nAlice;;2\nTotal;;2\n"
+ETAG = '"v1"'
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Page de connexion (jeton CSRF, cookie de session) et export CSV."""
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        state = self.server.state
+        url = urlparse(self.path)
+        if url.path == "/site/login":
+            self._send(200, '<input type="hidden" name="_csrf" value="jeton">')
+        elif url.path == "/distribution/export":
+            state["exports"] += 1
+            state["dates"].append(parse_qs(url.query)["date"][0])
+            time.sleep(state["delay"])
+            if f"session={state['session']}" not in self.headers.get("Cookie", ""):
+                self.send_response(302)
+                self.send_header("Location", "/site/login")
+                self.end_headers()
+            elif self.headers.get("If-None-Match") == ETAG:
+                state["not_modified"] += 1
+                self.send_response(304)
+                self.end_headers()
+            else:
+                self._send(200, CSV, {"ETag": ETAG})
+        else:
+            self._send(404, "")
+
+    def do_POST(self):
+        state = self.server.state
+        form = parse_qs(self.rfile.read(int(self.headers["Content-Length"])).decode())
+        state["logins"] += 1
+        if form.get("_csrf") != ["jeton"] or form.get("LoginForm[password]") != ["secret"]:
+            self._send(403, "")
+            return
+        self._send(200, "ok", {"Set-Cookie": f"session={state['session']}; Path=/"})
+
+    def _send(self, status: int, body: str, headers: dict | None = None):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class OrderClientTest(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.server.state = {"session": "s1", "exports": 0, "not_modified": 0, "logins": 0, "dates": [], "delay": 0.0}
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.cache_dir = Path(tempfile.mkdtemp())
+        host, port = self.server.server_address[:2]
+        self.client = OrderClient(base_url=f"http://{host}:{port}", cache_dir=self.cache_dir)
+        self.config = AppConfig(email="a@b.fr", password="secret")
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    @property
+    def state(self) -> dict:
+        return self.server.state
+
+    def test_fresh_cache_is_served_without_request(self):
+        path = self.client.fetch("2026-01-05", self.config)
+        self.assertEqual(path.read_text(encoding="utf-8"), CSV)
+
+        self.assertEqual(self.client.fetch("2026-01-05", self.config), path)
+        self.assertEqual(self.state["exports"], 1)
+        self.assertEqual(self.state["logins"], 1)
+
+    def test_expired_cache_is_revalidated(self):
+        config = AppConfig(email="a@b.fr", password="secret", orders_cache_ttl=0)
+        path = self.client.fetch("2026-01-05", config)
+        mtime = path.stat().st_mtime_ns
+
+        self.assertEqual(self.client.fetch("2026-01-05", config), path)
+        self.assertEqual(self.state["exports"], 2)
+        self.assertEqual(self.state["not_modified"], 1)
+        self.assertEqual(path.stat().st_mtime_ns, mtime)
+        self.assertEqual(path.read_text(encoding="utf-8"), CSV)
+
+    def test_expired_session_logs_in_again(self):
+        self.client.fetch("2026-01-05", self.config)
+        # Le serveur oublie la session: l'export redirige vers la connexion
+        self.state["session"] = "s2"
+
+        path = self.client.fetch("2026-01-06", self.config)
+        self.assertEqual(path.read_text(encoding="utf-8"), CSV)
+        self.assertEqual(self.state["logins"], 2)
+        self.assertEqual(self.state["exports"], 3)
+
+    def test_concurrent_fetches_of_a_date_share_one_download(self):
+        self.client.fetch("2026-01-04", self.config)  # connexion
+        self.state["delay"] = 0.2
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(self.client.fetch("2026-01-05", self.config)))
+            for _ in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.state["dates"].count("2026-01-05"), 1)
+        self.assertEqual(len(set(results)), 1)
+        self.assertEqual(results[0].read_text(encoding="utf-8"), CSV)
+        self.assertEqual(list(self.cache_dir.glob("*.tmp")), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+"""
+Tests de plan_placement comparé à une recherche exhaustive sur de petits cas.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from functools import lru_cache
+import random
+import unittest
+
+from model.bread_box_model import FreeBox
+from model.orders import Order
+from model.placement import plan_placement
+
+
+def _best_placed(orders: list[Order], singles: int, doubles: int) -> int:
+    """Nombre maximal de pains placés, par essai de toutes les affectations.
+
+    Chaque pain va en boîte simple, seul en boîte double, avec un pain de
+    la même commande en boîte double (petits pains), ou reste non placé.
+    Un gros pain ne va qu'en boîte double.
+    """
+    units = tuple(
+        (index, order.is_large) for index, order in enumerate(orders) for _ in range(order.qty)
+    )
+
+    @lru_cache(maxsize=None)
+    def search(remaining: tuple, n1: int, n2: int) -> int:
+        if not remaining:
+            return 0
+        (index, is_large), rest = remaining[0], remaining[1:]
+        best = search(rest, n1, n2)
+        if n2:
+            best = max(best, 1 + search(rest, n1, n2 - 1))
+        if not is_large:
+            if n1:
+                best = max(best, 1 + search(rest, n1 - 1, n2))
+            if n2 and (index, False) in rest:
+                position = rest.index((index, False))
+                paired = rest[:position] + rest[position + 1:]
+                best = max(best, 2 + search(paired, n1, n2 - 1))
+        return best
+
+    return search(units, singles, doubles)
+
+
+def _random_case(rng: random.Random) -> tuple[list[Order], list[FreeBox]]:
+    orders = []
+    for _ in range(rng.randint(0, 4)):
+        is_large = rng.random() < 0.3
+        bread = "Gros_L" if is_large else rng.choice(["Pain", "Seigle"])
+        order = Order(rng.choice("ab"), bread, rng.randint(1, 3), is_large)
+        orders.append(order)
+        if rng.random() < 0.3:
+            # Commande en double: deux valeurs égales dans la liste
+            orders.append(order)
+    boxes = [FreeBox(box_id, rng.choice((1, 2))) for box_id in range(rng.randint(0, 5))]
+    return orders, boxes
+
+
+class PlacementTest(unittest.TestCase):
+    def check(self, orders: list[Order], boxes: list[FreeBox]):
+        result = plan_placement(orders, boxes)
+
+        sizes = {box.id: box.size for box in boxes}
+        used = [box.id for box, _, _ in result.assignments]
+        self.assertEqual(len(used), len(set(used)), "boîte utilisée deux fois")
+
+        placed: Counter = Counter()
+        for box, user, content in result.assignments:
+            breads = content.split("\n")
+            self.assertIn(box.id, sizes)
+            if len(breads) == 2 or breads[0].endswith("_L"):
+                self.assertEqual(sizes[box.id], 2)
+            placed[(user, breads[0])] += len(breads)
+
+        # Chaque pain commandé est placé ou rendu dans unplaced
+        ordered: Counter = Counter()
+        for order in orders:
+            ordered[(order.user, order.bread)] += order.qty
+        for order in result.unplaced:
+            placed[(order.user, order.bread)] += order.qty
+        self.assertEqual(placed, ordered)
+
+        singles = sum(1 for box in boxes if box.size == 1)
+        expected = _best_placed(orders, singles, len(boxes) - singles)
+        self.assertEqual(sum(len(content.split("\n")) for _, _, content in result.assignments), expected)
+
+    def test_duplicate_orders_keep_their_own_count(self):
+        order = Order("a", "Pain", 2)
+        self.check([order, order], [FreeBox(0, 1)])
+
+    def test_matches_exhaustive_search(self):
+        rng = random.Random(1234)
+        for _ in range(500):
+            orders, boxes = _random_case(rng)
+            with self.subTest(orders=orders, boxes=boxes):
+                self.check(orders, boxes)
+
+
+if __name__ == "__main__":
+    unittest.main()
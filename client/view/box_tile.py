@@ -0,0 +1,95 @@
+"""
+Tuile représentant une boîte individuelle sur le Canvas de la grille
+"""
+
+import tkinter as tk
+from typing import Optional
+
+from model.bread_box_model import Box, BoxStatus
+
+
+class BoxTile:
+    """Tuile d'une boîte: un rectangle et un texte sur le Canvas de GridPanel"""
+    
+    # Couleurs pour les différents états
+    COLORS = {
+        BoxStatus.EMPTY: "#4CAF50",      # Vert - Disponible
+        BoxStatus.LOADED: "#2196F3",     # Bleu - Chargée, en attente
+        BoxStatus.RETRIEVED: "#2A6B2C",  # Vert - Récupérée par client
+        BoxStatus.OCCUPIED: "#BB7000",   # Orange - Récupérée (non utilisé)
+        BoxStatus.RESERVED: "#BDBDBD",   # Gris - Réservée
+        BoxStatus.ERROR: "#9E9E9E",      # Gris - Erreur
+    }
+    
+    HOVER_COLORS = {
+        BoxStatus.EMPTY: "#45a049",
+        BoxStatus.LOADED: "#1976D2",
+        BoxStatus.RETRIEVED: "#388E3C",  # Vert foncé au hover
+        BoxStatus.OCCUPIED: "#BD4403",   # Orange (non utilisé)
+        BoxStatus.RESERVED: "#BDBDBD",
+        BoxStatus.ERROR: "#757575",
+    }
+    
+    BORDER_COLOR = "#d0d0d0"
+    FONT = ("Arial", 12, "bold")
+    
+    def __init__(self, canvas: tk.Canvas, box_id: int, bbox: tuple[float, float, float, float]):
+        self.canvas = canvas
+        self.box_id = box_id
+        self.status = BoxStatus.EMPTY
+        self.current_color = self.COLORS[BoxStatus.EMPTY]
+        self.is_clickable = True
+        self.hovered = False
+        # Dernier état affiché (status, user_id, bread_name)
+        self._rendered_state = None
+        
+        x1, y1, x2, y2 = bbox
+        self.rect = canvas.create_rectangle(
+            x1, y1, x2, y2,
+            fill=self.current_color,
+            outline=self.BORDER_COLOR,
+            width=2
+        )
+        self.text = canvas.create_text(
+            (x1 + x2) / 2, (y1 + y2) / 2,
+            text=f"#{box_id + 1}",
+            font=self.FONT,
+            fill="white",
+            width=max(1, x2 - x1 - 8),
+            justify=tk.CENTER
+        )
+    
+    def delete(self):
+        """Supprime les éléments de la tuile du Canvas"""
+        self.canvas.delete(self.rect, self.text)
+    
+    def set_hover(self, hovered: bool):
+        """Effet hover"""
+        self.hovered = hovered and self.is_clickable
+        color = self.HOVER_COLORS[self.status] if self.hovered else self.current_color
+        self.canvas.itemconfigure(self.rect, fill=color)
+    
+    def update_status(self, box: Box):
+        """Met à jour l'affichage selon le statut (rien si l'état affiché est identique)"""
+        state = (box.status, box.user_id, box.bread_name)
+        if state == self._rendered_state:
+            return
+        self._rendered_state = state
+        status = box.status
+        self.status = status
+        self.current_color = self.COLORS[status]
+        if status == BoxStatus.RESERVED:
+            self.is_clickable = False
+            self.hovered = False
+            text, fg = "Réservée", "#555555"
+        elif status == BoxStatus.EMPTY:
+            self.is_clickable = True
+            text, fg = f"#{self.box_id + 1}", "white"
+        else:
+            # LOADED (en attente de récupération), RETRIEVED, OCCUPIED
+            self.is_clickable = True
+            name = box.user_id or ""
+            bread = box.bread_name or ""
+            text, fg = f"{name}\n{bread}".strip(), "white"
+        self.canvas.itemconfigure(self.text, text=text, fill=fg)
+        self.set_hover(self.hovered)
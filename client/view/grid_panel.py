@@ -1,47 +1,187 @@
 """
-Panel contenant la grille de 28 boîtes
+Panel contenant la grille des boîtes (un seul Canvas)
 """
 
 import tkinter as tk
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 if TYPE_CHECKING:
     from controller.app_controller import AppController
 
-from view.box_widget import BoxWidget
+from view.box_tile import BoxTile
 
 
 class GridPanel(tk.Frame):
-    """Panel contenant la grille de 28 boîtes"""
+    """Panel contenant la grille des boîtes.
+    
+    Les boîtes sont dessinées comme des tuiles (rectangle + texte) sur un
+    seul Canvas, en lignes x colonnes selon la configuration. Seules les
+    lignes visibles ont des tuiles: au-delà de MIN_TILE_HEIGHT, la grille
+    défile et les tuiles sont créées à l'affichage de leur ligne. Le clic et
+    le survol sont résolus par calcul de position (pas de widget par boîte).
+    """
+    
+    MARGIN = 20
+    GAP = 6
+    MIN_TILE_HEIGHT = 56
     
     def __init__(self, parent, controller: 'AppController'):
         super().__init__(parent, bg="#f0f0f0")
         
         self.controller = controller
-        self.box_widgets = []
-        
-        # Création de la grille 4x7
-        self.grid_frame = tk.Frame(self, bg="#f0f0f0")
-        self.grid_frame.pack(expand=True, fill=tk.BOTH, padx=20, pady=20)
-        
-        # Configuration de la grille pour qu'elle soit centrée et responsive
-        for i in range(7):
-            self.grid_frame.grid_rowconfigure(i, weight=1, uniform="row")
-        for j in range(4):
-            self.grid_frame.grid_columnconfigure(j, weight=1, uniform="col")
-        
-        # Création des 28 boîtes (4 colonnes x 7 lignes)
-        for i in range(7):
-            for j in range(4):
-                box_id = i * 4 + j
-                box = BoxWidget(self.grid_frame, box_id, controller)
-                box.grid(row=i, column=j, sticky="nsew", padx=3, pady=3)
-                self.box_widgets.append(box)
-    
-    def update_boxes(self):
-        """Met à jour l'affichage de toutes les boîtes"""
+        # Tuiles des lignes visibles, par id de boîte
+        self.tiles: dict[int, BoxTile] = {}
+        self._hover_id: Optional[int] = None
+        self.num_boxes = 0
+        self.rows = 0
+        self.columns = 1
+        self._tile_width = 0.0
+        self._tile_height = 0.0
+        
+        self.scrollbar = tk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scroll)
+        self.canvas = tk.Canvas(
+            self,
+            bg="#f0f0f0",
+            highlightthickness=0,
+            yscrollcommand=self.scrollbar.set
+        )
+        self.canvas.pack(side=tk.LEFT, expand=True, fill=tk.BOTH)
+        
+        # Interactions: position -> boîte
+        self.canvas.bind("<Configure>", lambda event: self._layout())
+        self.canvas.bind("<Button-1>", self._on_click)
+        self.canvas.bind("<Motion>", self._on_motion)
+        self.canvas.bind("<Leave>", lambda event: self._set_hover(None))
+        self.canvas.bind("<MouseWheel>", lambda event: self._scroll_units(-1 if event.delta > 0 else 1))
+        self.canvas.bind("<Button-4>", lambda event: self._scroll_units(-1))
+        self.canvas.bind("<Button-5>", lambda event: self._scroll_units(1))
+        
+        self.set_layout()
+    
+    def set_layout(self):
+        """Recalcule la grille (nombre de boîtes, lignes, colonnes) du modèle affiché"""
+        self.num_boxes = self.controller.get_model().num_boxes
+        self.rows, self.columns = self.controller.get_config().grid_shape(self.num_boxes)
+        self.canvas.yview_moveto(0)
+        self._layout()
+    
+    def update_boxes(self, changed_ids: Optional[set[int]] = None):
+        """Met à jour les tuiles visibles modifiées (toutes si None)"""
         model = self.controller.get_model()
-        for widget in self.box_widgets:
-            box = model.get_box(widget.box_id)
+        if changed_ids is None:
+            tiles = list(self.tiles.values())
+        else:
+            tiles = [self.tiles[box_id] for box_id in changed_ids if box_id in self.tiles]
+        for tile in tiles:
+            box = model.get_box(tile.box_id)
             if box:
-                widget.update_status(box)
+                tile.update_status(box)
+    
+    def box_at(self, x: int, y: int) -> Optional[int]:
+        """Retourne l'id de la boîte sous le point (coordonnées du widget)"""
+        if not self._tile_width or not self._tile_height:
+            return None
+        cx = x - self.MARGIN
+        cy = self.canvas.canvasy(y) - self.MARGIN
+        if cx < 0 or cy < 0:
+            return None
+        column = int(cx // self._tile_width)
+        row = int(cy // self._tile_height)
+        if column >= self.columns or row >= self.rows:
+            return None
+        # Dans l'espace entre deux tuiles
+        if cx - column * self._tile_width > self._tile_width - self.GAP:
+            return None
+        if cy - row * self._tile_height > self._tile_height - self.GAP:
+            return None
+        box_id = row * self.columns + column
+        return box_id if box_id < self.num_boxes else None
+    
+    def _layout(self):
+        """Taille des tuiles selon le Canvas; recrée les tuiles visibles"""
+        width = max(1, self.canvas.winfo_width())
+        height = max(1, self.canvas.winfo_height())
+        self._tile_width = max(1.0, (width - 2 * self.MARGIN + self.GAP) / self.columns)
+        self._tile_height = max(
+            float(self.MIN_TILE_HEIGHT),
+            (height - 2 * self.MARGIN + self.GAP) / max(1, self.rows),
+        )
+        total_height = 2 * self.MARGIN + self.rows * self._tile_height - self.GAP
+        self.canvas.configure(scrollregion=(0, 0, width, total_height))
+        
+        # Barre de défilement seulement si la grille dépasse
+        if total_height > height + 1:
+            self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y, before=self.canvas)
+        else:
+            self.scrollbar.pack_forget()
+        
+        for tile in self.tiles.values():
+            tile.delete()
+        self.tiles = {}
+        self._hover_id = None
+        self._draw_visible()
+    
+    def _draw_visible(self):
+        """Crée les tuiles des lignes visibles et supprime les autres"""
+        if not self._tile_height:
+            return
+        top = self.canvas.canvasy(0) - self.MARGIN
+        bottom = self.canvas.canvasy(self.canvas.winfo_height()) - self.MARGIN
+        first_row = max(0, int(top // self._tile_height))
+        last_row = min(self.rows - 1, int(bottom // self._tile_height))
+        visible = {
+            row * self.columns + column
+            for row in range(first_row, last_row + 1)
+            for column in range(self.columns)
+            if row * self.columns + column < self.num_boxes
+        }
+        
+        for box_id in [box_id for box_id in self.tiles if box_id not in visible]:
+            self.tiles.pop(box_id).delete()
+        
+        model = self.controller.get_model()
+        for box_id in sorted(visible - self.tiles.keys()):
+            row, column = divmod(box_id, self.columns)
+            x1 = self.MARGIN + column * self._tile_width
+            y1 = self.MARGIN + row * self._tile_height
+            tile = BoxTile(
+                self.canvas, box_id,
+                (x1, y1, x1 + self._tile_width - self.GAP, y1 + self._tile_height - self.GAP)
+            )
+            box = model.get_box(box_id)
+            if box:
+                tile.update_status(box)
+            self.tiles[box_id] = tile
+    
+    def _on_scroll(self, *args):
+        self.canvas.yview(*args)
+        self._draw_visible()
+    
+    def _scroll_units(self, units: int):
+        if self.scrollbar.winfo_ismapped():
+            self._on_scroll("scroll", units, "units")
+    
+    def _on_click(self, event):
+        """Gère le clic sur une tuile"""
+        box_id = self.box_at(event.x, event.y)
+        tile = self.tiles.get(box_id) if box_id is not None else None
+        if tile is None or not tile.is_clickable:
+            return
+        self.controller.on_box_clicked(box_id)
+    
+    def _on_motion(self, event):
+        self._set_hover(self.box_at(event.x, event.y))
+    
+    def _set_hover(self, box_id: Optional[int]):
+        """Déplace l'effet hover sur la tuile box_id (aucune si None)"""
+        if box_id == self._hover_id:
+            return
+        previous = self.tiles.get(self._hover_id) if self._hover_id is not None else None
+        if previous is not None:
+            previous.set_hover(False)
+        self._hover_id = box_id
+        tile = self.tiles.get(box_id) if box_id is not None else None
+        if tile is not None:
+            tile.set_hover(True)
+        clickable = tile is not None and tile.is_clickable
+        self.canvas.configure(cursor="hand2" if clickable else "")
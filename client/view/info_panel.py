@@ -2,6 +2,8 @@
 Panel latéral avec informations et logs
 """
 
+import bisect
+import itertools
 import tkinter as tk
 from tkinter import ttk
 from typing import TYPE_CHECKING
@@ -15,6 +17,9 @@ if TYPE_CHECKING:
 class InfoPanel(tk.Frame):
     """Panel latéral avec informations et logs"""
     
+    # Nombre maximal de lignes affichées dans la zone de logs
+    MAX_VISIBLE_LOG_LINES = 500
+    
     def __init__(self, parent, controller: 'AppController'):
         super().__init__(parent, bg="white", relief=tk.SUNKEN, borderwidth=1)
         
@@ -23,6 +28,13 @@ class InfoPanel(tk.Frame):
         # Liste des logs système (en mémoire uniquement)
         self.system_logs = []  # Liste de tuples (datetime, message)
         
+        # Chronologie triée (badges + système) de la date affichée:
+        # tuples (datetime, numéro d'ordre, ligne affichée). Seules les
+        # MAX_VISIBLE_LOG_LINES dernières entrées sont dans le widget.
+        self._timeline: list[tuple[datetime, int, str]] = []
+        self._timeline_seq = itertools.count()
+        self._displayed_date = None
+        
         # Titre
         title = tk.Label(
             self,
@@ -175,6 +187,30 @@ class InfoPanel(tk.Frame):
         self.date_entry.pack(side=tk.LEFT, fill=tk.X)
         self.date_entry.bind("<<DateEntrySelected>>", self.on_date_change)
         
+        # Sélection du casier affiché (mode flotte uniquement)
+        locker_names = self.controller.get_locker_names()
+        if locker_names:
+            locker_frame = tk.Frame(self, bg="white")
+            locker_frame.pack(fill=tk.X, padx=10, pady=(0, 10))
+            
+            tk.Label(
+                locker_frame,
+                text="Casier:",
+                font=("Arial", 10),
+                bg="white",
+                fg="#666666"
+            ).pack(side=tk.LEFT, padx=(0, 8))
+            
+            self.locker_combo = ttk.Combobox(
+                locker_frame,
+                values=locker_names,
+                state="readonly",
+                font=("Arial", 10)
+            )
+            self.locker_combo.current(0)
+            self.locker_combo.pack(side=tk.LEFT, fill=tk.X, expand=True)
+            self.locker_combo.bind("<<ComboboxSelected>>", self.on_locker_change)
+        
         # Séparateur
         ttk.Separator(self, orient=tk.HORIZONTAL).pack(fill=tk.X, padx=10, pady=15)
         
@@ -230,6 +266,10 @@ class InfoPanel(tk.Frame):
         # Recharger les logs pour la nouvelle date
         self.reload_logs()
     
+    def on_locker_change(self, event):
+        """Callback appelé quand le casier affiché change"""
+        self.controller.select_locker(self.locker_combo.current())
+    
     def on_swap_boxes(self):
         """Callback pour échanger deux cases"""
         self.add_log("Mode échange de deux cases activé")
@@ -359,60 +399,100 @@ class InfoPanel(tk.Frame):
         """Ajoute un message système aux logs (en mémoire uniquement)"""
         now = datetime.now()
         self.system_logs.append((now, message))
-        self.refresh_logs_display()
+        self._insert_log_entries([(now, message)])
     
     def add_badge_logs(self, badge_logs: list[tuple[datetime, str]]):
         """
-        Ajoute des logs de badges et rafraîchit l'affichage.
+        Ajoute des logs de badges à l'affichage.
         
         Args:
             badge_logs: Liste de tuples (datetime, nom_client)
         """
-        self.refresh_logs_display()
+        self._insert_log_entries([
+            (log_datetime, self._format_badge_log(log_datetime, client_name))
+            for log_datetime, client_name in badge_logs
+        ])
     
     def reload_logs(self):
         """Recharge les logs pour la date sélectionnée"""
         self.refresh_logs_display()
     
+    def get_timeline(self) -> list[tuple[datetime, str]]:
+        """Retourne tous les logs de la date affichée, y compris ceux hors du widget"""
+        return [(entry[0], entry[2]) for entry in self._timeline]
+    
     def refresh_logs_display(self):
-        """Rafraîchit l'affichage des logs triés par timestamp"""
-        selected_date = self.get_selected_date()
-        if selected_date is None:
-            selected_date = datetime.now().date()
+        """Reconstruit entièrement l'affichage des logs triés par timestamp"""
+        selected_date = self._current_date()
+        self._displayed_date = selected_date
         
         # Charger les logs de badges depuis le fichier pour la date sélectionnée
         badge_logs = self.controller.load_logs_for_date(selected_date)
         
-        # Filtrer les logs système pour la date sélectionnée
-        filtered_system_logs = [
+        # Combiner les logs de badges et les logs système de la date
+        all_logs = [
+            (log_datetime, self._format_badge_log(log_datetime, client_name))
+            for log_datetime, client_name in badge_logs
+        ]
+        all_logs.extend(
             (dt, msg) for dt, msg in self.system_logs
             if dt.date() == selected_date
-        ]
-        
-        # Combiner et trier tous les logs par timestamp
-        all_logs = []
-        
-        # Ajouter les logs de badges avec leur format
-        for log_datetime, client_name in badge_logs:
-            time_str = log_datetime.strftime("%H:%M:%S")
-            formatted_msg = f"{client_name} a badgé à {time_str}"
-            all_logs.append((log_datetime, formatted_msg))
-        
-        # Ajouter les logs système
-        for log_datetime, message in filtered_system_logs:
-            all_logs.append((log_datetime, message))
+        )
         
-        # Trier par timestamp
+        # Trier par timestamp (tri stable: l'ordre d'arrivée départage)
         all_logs.sort(key=lambda x: x[0])
+        self._timeline = [
+            (log_datetime, next(self._timeline_seq), message)
+            for log_datetime, message in all_logs
+        ]
         
         # Effacer et remplir le widget de texte
+        visible = self._timeline[-self.MAX_VISIBLE_LOG_LINES:]
         self.log_text.config(state=tk.NORMAL)
         self.log_text.delete(1.0, tk.END)
+        self.log_text.insert(tk.END, "".join(self._format_line(entry) for entry in visible))
+        self.log_text.see(tk.END)
+        self.log_text.config(state=tk.DISABLED)
+    
+    def _insert_log_entries(self, entries: list[tuple[datetime, str]]):
+        """Insère de nouveaux logs à leur place sans reconstruire le widget"""
+        if self._displayed_date != self._current_date():
+            # La date a changé: reconstruction complète
+            self.refresh_logs_display()
+            return
         
-        for log_datetime, message in all_logs:
-            timestamp = log_datetime.strftime("%H:%M:%S")
-            log_entry = f"[{timestamp}] {message}\n"
-            self.log_text.insert(tk.END, log_entry)
+        self.log_text.config(state=tk.NORMAL)
+        for log_datetime, message in entries:
+            if log_datetime.date() != self._displayed_date:
+                continue
+            entry = (log_datetime, next(self._timeline_seq), message)
+            position = bisect.bisect_right(self._timeline, entry)
+            self._timeline.insert(position, entry)
+            
+            first_visible = max(0, len(self._timeline) - self.MAX_VISIBLE_LOG_LINES)
+            if position < first_visible:
+                # Entrée plus ancienne que la fenêtre affichée
+                continue
+            if first_visible > 0:
+                # La fenêtre avance: retirer la plus ancienne ligne affichée
+                self.log_text.delete("1.0", "2.0")
+            self.log_text.insert(f"{position - first_visible + 1}.0", self._format_line(entry))
         
         self.log_text.see(tk.END)
         self.log_text.config(state=tk.DISABLED)
+    
+    def _current_date(self):
+        selected_date = self.get_selected_date()
+        if selected_date is None:
+            selected_date = datetime.now().date()
+        return selected_date
+    
+    @staticmethod
+    def _format_badge_log(log_datetime: datetime, client_name: str) -> str:
+        time_str = log_datetime.strftime("%H:%M:%S")
+        return f"{client_name} a badgé à {time_str}"
+    
+    @staticmethod
+    def _format_line(entry: tuple[datetime, int, str]) -> str:
+        timestamp = entry[0].strftime("%H:%M:%S")
+        return f"[{timestamp}] {entry[2]}\n"
@@ -3,7 +3,7 @@ Fenêtre principale de l'application
 """
 
 import tkinter as tk
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 if TYPE_CHECKING:
     from controller.app_controller import AppController
@@ -49,9 +49,9 @@ class MainWindow:
         """Lance la boucle principale de l'interface"""
         self.root.mainloop()
     
-    def update_display(self):
-        """Met à jour l'affichage complet"""
-        self.grid_panel.update_boxes()
+    def update_display(self, changed_ids: Optional[set[int]] = None):
+        """Met à jour l'affichage (toutes les boîtes si changed_ids est None)"""
+        self.grid_panel.update_boxes(changed_ids)
         self.info_panel.update_statistics()
 
     def get_selected_date(self):
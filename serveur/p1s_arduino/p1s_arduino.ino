@@ -12,19 +12,47 @@
 #define SS_PIN 7
 #define RST_PIN 6
 
+// Commandes TCP: "<commande>." (ex: "c-XXXXXXXX-XXXXXXXX,YYYYYYYY.")
+#define CMD_BUFFER_SIZE (16 + NB_CASIERS * 18)
+#define CLIENT_IDLE_TIMEOUT 300000UL // ferme une session inactive (5 min)
+
+// Chargement binaire: "B" + nombre de casiers (uint16) + badges principal
+// et secondaire (uint32) de chaque casier + CRC-32, little-endian, puis '.'
+#define FRAME_MAX_SIZE (2 + NB_CASIERS * 8 + 4 + 1)
+#define FRAME_TIMEOUT 1000UL
+
+// Badges sur la carte SD: NB_CASIERS enregistrements de 8 octets
+// (principal, secondaire), réécrits sur place
+#define TAGS_FILE "tags.bin"
+#define TAG_RECORD_SIZE 8
+
+// Notification des badges (UDP) au client abonné avec "p<port>."
+#define PUSH_LOCAL_PORT 2391
+
 // SD write
 const int chipSelect = 4;
 const char* ntpServer = "0.fr.pool.ntp.org"; 
 
 int status = WL_IDLE_STATUS;     // the Wifi radio's status
 WiFiServer server(8080);
-WiFiClient client = server.available();
+WiFiClient client;
+char cmdBuffer[CMD_BUFFER_SIZE];
+int cmdLength = 0;
+unsigned long lastClientActivity = 0;
 
 WiFiUDP udp;
 NTPClient timeClient(udp, ntpServer, 3600);
 
+WiFiUDP pushUdp;
+IPAddress pushIP;
+unsigned int pushPort = 0;  // 0: pas d'abonné
+
 MFRC522 rfid(SS_PIN, RST_PIN);
 
+// Journal des badges: position absolue = logBase + position dans datalog.txt
+unsigned long logBase = 0;   // octets déjà supprimés (persisté dans logbase.txt)
+unsigned long logAcked = 0;  // position acquittée par le client ("l<position>")
+
 unsigned long tags[NB_CASIERS] = {0};
 unsigned long tags_secondaires[NB_CASIERS] = {0};
 
@@ -46,6 +74,7 @@ void setup() {
   enable_WiFi();
   connect_WiFi();
   server.begin();
+  pushUdp.begin(PUSH_LOCAL_PORT);
 
   // Initialisation de la carte SD
   if (!SD.begin(chipSelect)) {
@@ -58,6 +87,9 @@ void setup() {
 
   // LOAD USERS
   loadUsers();
+
+  // LOAD LOG POSITION
+  loadLogBase();
 }
 
 
@@ -98,20 +130,22 @@ void card_check(unsigned long key) {
 
 // LOG CARD
 void log_card(unsigned long key) {
-  long maxFileSize = 3000; // Taille max fichier
+  unsigned long maxFileSize = 3000;      // Taille max fichier (logs acquittés)
+  unsigned long maxFileSizeHard = 64000; // Taille max fichier (même non acquittés)
 
   // Vérifier si le fichier existe
   if (SD.exists("datalog.txt")) {
     File dataFile = SD.open("datalog.txt", FILE_READ);
     // Vérifier la taille du fichier
-    long fileSize = dataFile.size();
+    unsigned long fileSize = dataFile.size();
     // Fermer le fichier avant toute suppression ou réécriture
 
     dataFile.close();
 
-    // Si la taille dépasse 1 Mo, on supprime le fichier
-    if (fileSize > maxFileSize) {
-      SD.remove("datalog.txt");
+    // Le fichier n'est supprimé que si le client a tout récupéré
+    bool acked = (logAcked >= logBase + fileSize);
+    if ((fileSize > maxFileSize && acked) || fileSize > maxFileSizeHard) {
+      remove_logs();
       Serial.println("Suppression des logs.");
     }
   }
@@ -133,69 +167,189 @@ void log_card(unsigned long key) {
 
   File dataFile = SD.open("datalog.txt", FILE_WRITE);
   if (dataFile) {
+    unsigned long position = logBase + dataFile.size();
     // Ajouter la ligne passée en paramètre
     dataFile.println(line);
     dataFile.close();  // Fermer le fichier après écriture
+
+    push_log(position, line);
   }
 }
 
-// READ LOGS
-String read_logs() {
-  String fileContent = "";
+// PUSH LOG
+// Datagramme "E<position>\n" suivi de la ligne telle qu'écrite dans
+// datalog.txt ("\r\n" compris). La position absolue permet au client
+// d'ignorer une ligne déjà reçue par "l" et de détecter un datagramme perdu.
+void push_log(unsigned long position, const char* line) {
+  if (pushPort == 0)
+    return;
+
+  char header[16];
+  sprintf(header, "E%lu\n", position);
+  pushUdp.beginPacket(pushIP, pushPort);
+  pushUdp.write((const uint8_t*)header, strlen(header));
+  pushUdp.write((const uint8_t*)line, strlen(line));
+  pushUdp.write((const uint8_t*)"\r\n", 2);
+  pushUdp.endPacket();
+}
+
+// SEND LOGS
+// Réponse tramée: "L<octets>@<position>/<logBase>" puis datalog.txt à partir
+// de la position absolue demandée, lu par blocs depuis la carte SD et écrit
+// directement sur le socket. La position demandée acquitte les logs qui
+// la précèdent. logBase permet au client de voir que le journal a
+// recommencé à zéro (logbase.txt perdu) et de tout relire.
+void send_logs(unsigned long from) {
+  File dataFile;
+  unsigned long fileSize = 0;
 
   // Vérifier si le fichier existe
   if (SD.exists("datalog.txt")) {
-    File dataFile = SD.open("datalog.txt", FILE_READ);
-    // Vérifier si le fichier s'est bien ouvert
-    if (dataFile) {
-      // Lire le fichier caractère par caractère et ajouter dans fileContent
-      while (dataFile.available()) {
-        fileContent += (char)dataFile.read();
-      }
+    dataFile = SD.open("datalog.txt", FILE_READ);
+    if (dataFile)
+      fileSize = dataFile.size();
+  }
 
-      dataFile.close();  // Fermer le fichier après la lecture
-    }
+  // Position hors du fichier courant (journal supprimé entre-temps,
+  // carte SD changée): on renvoie tout le fichier
+  unsigned long start = 0;
+  if (from >= logBase && from - logBase <= fileSize) {
+    start = from - logBase;
+    logAcked = from;
   }
 
-  return fileContent;
+  client.print("L");
+  client.print(fileSize - start);
+  client.print("@");
+  client.print(logBase + start);
+  client.print("/");
+  client.println(logBase);
+
+  if (dataFile) {
+    dataFile.seek(start);
+    uint8_t chunk[64];
+    unsigned long remaining = fileSize - start;
+    while (remaining > 0) {
+      int n = dataFile.read(chunk, remaining < sizeof(chunk) ? remaining : sizeof(chunk));
+      if (n <= 0)
+        break;
+      client.write(chunk, n);
+      remaining -= n;
+    }
+    dataFile.close();  // Fermer le fichier après la lecture
+  }
 }
 
 // REMOVE LOGS
 void remove_logs() {
   // Vérifier si le fichier existe
   if (SD.exists("datalog.txt")) {
+    File dataFile = SD.open("datalog.txt", FILE_READ);
+    if (dataFile) {
+      logBase += dataFile.size();
+      dataFile.close();
+    }
     SD.remove("datalog.txt");
+    saveLogBase();
   }
 }
 
-// SAVE USERS
-void saveUsers() {
-  if (SD.exists("tags.txt"))
-    SD.remove("tags.txt");
-  if (SD.exists("tags_sup.txt"))
-    SD.remove("tags_sup.txt");
+// SAVE LOG POSITION
+void saveLogBase() {
+  if (SD.exists("logbase.txt"))
+    SD.remove("logbase.txt");
 
-  File dataFile = SD.open("tags.txt", FILE_WRITE);
+  File dataFile = SD.open("logbase.txt", FILE_WRITE);
   if (dataFile) {
-    for (int i = 0; i < sizeof(tags) / sizeof(tags[0]); i++) {
-      dataFile.println(tags[i]);
-    }
+    dataFile.println(logBase);
     dataFile.close();
   } else
     Serial.println("Erreur lors de l'ouverture du fichier.");
+}
 
-  dataFile = SD.open("tags_sup.txt", FILE_WRITE);
+// LOAD LOG POSITION
+void loadLogBase() {
+  File dataFile = SD.open("logbase.txt");
   if (dataFile) {
-    for (int i = 0; i < sizeof(tags_secondaires) / sizeof(tags_secondaires[0]); i++) {
-      dataFile.println(tags_secondaires[i]);
-    }
+    logBase = strtoul(dataFile.readStringUntil('\n').c_str(), NULL, 10);
     dataFile.close();
-  } else
+  }
+}
+
+// LITTLE-ENDIAN
+unsigned long read_u32(const uint8_t* data) {
+  return (unsigned long)data[0] | ((unsigned long)data[1] << 8)
+    | ((unsigned long)data[2] << 16) | ((unsigned long)data[3] << 24);
+}
+
+void write_u32(uint8_t* data, unsigned long value) {
+  data[0] = value & 0xFF;
+  data[1] = (value >> 8) & 0xFF;
+  data[2] = (value >> 16) & 0xFF;
+  data[3] = (value >> 24) & 0xFF;
+}
+
+// CRC-32 (même valeur que zlib.crc32 côté client)
+unsigned long crc32(const uint8_t* data, unsigned int len) {
+  unsigned long crc = 0xFFFFFFFFUL;
+  for (unsigned int i = 0; i < len; i++) {
+    crc ^= data[i];
+    for (int bit = 0; bit < 8; bit++)
+      crc = (crc >> 1) ^ (0xEDB88320UL & (0UL - (crc & 1)));
+  }
+  return ~crc;
+}
+
+// SAVE USERS
+// Seuls les enregistrements modifiés sont réécrits: le fichier garde une
+// taille fixe et un rechargement identique n'écrit rien sur la carte SD.
+bool saveUsers() {
+  File dataFile = SD.open(TAGS_FILE, O_READ | O_WRITE | O_CREAT);
+  if (!dataFile) {
     Serial.println("Erreur lors de l'ouverture du fichier.");
+    return false;
+  }
+  for (int i = 0; i < NB_CASIERS; i++) {
+    uint8_t record[TAG_RECORD_SIZE];
+    uint8_t stored[TAG_RECORD_SIZE];
+    write_u32(record, tags[i]);
+    write_u32(record + 4, tags_secondaires[i]);
+
+    unsigned long position = (unsigned long)i * TAG_RECORD_SIZE;
+    dataFile.seek(position);
+    if (dataFile.read(stored, TAG_RECORD_SIZE) == TAG_RECORD_SIZE
+        && memcmp(stored, record, TAG_RECORD_SIZE) == 0)
+      continue;
+    dataFile.seek(position);
+    dataFile.write(record, TAG_RECORD_SIZE);
+  }
+  dataFile.close();
+  return true;
 }
 
 // LOAD USERS
 void loadUsers() {
+  File dataFile = SD.open(TAGS_FILE);
+  if (dataFile) {
+    uint8_t record[TAG_RECORD_SIZE];
+    for (int i = 0; i < NB_CASIERS && dataFile.read(record, TAG_RECORD_SIZE) == TAG_RECORD_SIZE; i++) {
+      tags[i] = read_u32(record);
+      tags_secondaires[i] = read_u32(record + 4);
+    }
+    dataFile.close();
+    return;
+  }
+
+  // Ancien format (tags.txt et tags_sup.txt, un badge par ligne): converti
+  // une fois en tags.bin
+  if (loadLegacyUsers() && saveUsers()) {
+    SD.remove("tags.txt");
+    SD.remove("tags_sup.txt");
+  }
+}
+
+bool loadLegacyUsers() {
+  bool found = false;
   File dataFile = SD.open("tags.txt");
   if (dataFile) {
     int index = 0;
@@ -203,6 +357,7 @@ void loadUsers() {
       tags[index++] = dataFile.parseInt();
     }
     dataFile.close();
+    found = true;
   }
 
   dataFile = SD.open("tags_sup.txt");
@@ -212,7 +367,9 @@ void loadUsers() {
       tags_secondaires[index++] = dataFile.parseInt();
     }
     dataFile.close();
+    found = true;
   }
+  return found;
 }
 
 // WIFI SETUP
@@ -241,78 +398,170 @@ void connect_WiFi() {
   }
 }
 
-// READ WIFI MESSAGE
-void readClient() {
-  if (client) {                             // if you get a client,
-    Serial.println("new client");           // print a message out the serial port
-    while (client.connected()) {            // loop while the client's connected
-      if (client.available()) {             // if there's bytes to read from the client,
-        char c = client.read();             // read a byte, then
-        if (c == '.') {                    // if the byte is a newline character
-            client.println("OK");
-            break;
-        }
-        else if (c != '\r') {
-          if (c == 'l') { // send LOGS
-            client.println(read_logs());
-          }
-          else if (c == 'r') { // remove LOGS
-            remove_logs();
-          }   
-          else if (c == 'a') { // open ALL
-            for (int i = 0; i < NB_CASIERS; i++) {
-              if (tags[i] != 0) { // Ouvrir seulement si un badge est assigné
-                open_door(i);
-              }
-            }
-          }
-          else if (c == 'c') { // load CASIERS
-            c = client.read();
-            for (int i = 0; i < NB_CASIERS; i++) { // Refresh casiers
-              tags_secondaires[i] = 0;
-              tags[i] = 0;
-            }
-            int nbcasier = 0;
-            while (c == '-' || c == ',') {
-              bool casier_secondaire = false;
-              if (c == ',')
-                casier_secondaire = true;
-
-              char key[9];
-              for(int i = 0; i < 8; i++) {
-                c = client.read();
-                key[i] = c;
-              }
-              key[8] = '\0';
-              unsigned long value = strtoul(key, NULL, 16);
-              
-              if (casier_secondaire)
-                tags_secondaires[nbcasier-1] = value;
-              else{
-                tags[nbcasier] = value;
-                nbcasier++;
-              }
-              c = client.read();
-            }
-            saveUsers(); // save on SD
-            break;
-          } else if (c == 'o'){ // OPEN casier
-            char order[4]; // max 3 chiffres casier + '\0'
-            int i = 0;
-            while (c != '.' && i < 3) {
-                c = client.read();
-                order[i++] = c;
-            }
-            order[i] = '\0';
-            open_door(atoi(order));
-            break;
-          }
-        }
+// LOAD CASIERS ("-XXXXXXXX" = badge principal, ",XXXXXXXX" = secondaire)
+void load_casiers(const char* data, int len) {
+  for (int i = 0; i < NB_CASIERS; i++) { // Refresh casiers
+    tags_secondaires[i] = 0;
+    tags[i] = 0;
+  }
+  int nbcasier = 0;
+  int pos = 0;
+  while (pos + 9 <= len && (data[pos] == '-' || data[pos] == ',')) {
+    bool casier_secondaire = (data[pos] == ',');
+
+    char key[9];
+    memcpy(key, data + pos + 1, 8);
+    key[8] = '\0';
+    unsigned long value = strtoul(key, NULL, 16);
+
+    if (casier_secondaire) {
+      if (nbcasier > 0)
+        tags_secondaires[nbcasier-1] = value;
+    }
+    else if (nbcasier < NB_CASIERS) {
+      tags[nbcasier] = value;
+      nbcasier++;
+    }
+    pos += 9;
+  }
+  saveUsers(); // save on SD
+}
+
+// Ferme la session au milieu d'une trame binaire: la fin de la trame n'a
+// pas été lue, le flux ne peut pas être relu comme des commandes texte.
+void drop_client(const char* reason) {
+  Serial.print("trame abandonnee: ");
+  Serial.println(reason);
+  client.stop();
+  cmdLength = 0;
+}
+
+// LOAD CASIERS (trame binaire "B", lue d'un bloc après le 'B')
+// Répond "ERR <raison>" puis "OK" si la trame est invalide; les badges ne
+// sont alors pas modifiés. Si la trame n'arrive pas en entier, la session
+// est fermée sans réponse.
+void receive_casiers_frame() {
+  uint8_t frame[FRAME_MAX_SIZE];
+  const char* error = NULL;
+
+  client.setTimeout(FRAME_TIMEOUT);
+  if (client.readBytes(frame, 2) != 2) {
+    drop_client("en-tete incomplet");
+    return;
+  }
+
+  unsigned int count = frame[0] | (frame[1] << 8);
+  unsigned int remaining = count * 8 + 4 + 1;
+  if (count > NB_CASIERS) {
+    // Trame trop longue: la lire en entier pour rester synchronisé
+    while (remaining > 0) {
+      int n = client.readBytes(frame, remaining < sizeof(frame) ? remaining : sizeof(frame));
+      if (n <= 0) {
+        drop_client("trame trop longue incomplete");
+        return;
       }
+      remaining -= n;
     }
-    // close the connection:
+    error = "trop de casiers";
+  }
+  else if (client.readBytes(frame + 2, remaining) != remaining) {
+    drop_client("trame incomplete");
+    return;
+  }
+  else if (frame[2 + count * 8 + 4] != '.') {
+    error = "fin de trame manquante";
+  }
+  else if (crc32(frame, 2 + count * 8) != read_u32(frame + 2 + count * 8)) {
+    error = "somme de controle invalide";
+  }
+  else {
+    for (int i = 0; i < NB_CASIERS; i++) {
+      tags[i] = ((unsigned int)i < count) ? read_u32(frame + 2 + i * 8) : 0;
+      tags_secondaires[i] = ((unsigned int)i < count) ? read_u32(frame + 2 + i * 8 + 4) : 0;
+    }
+    saveUsers(); // save on SD
+  }
+
+  if (error != NULL) {
+    client.print("ERR ");
+    client.println(error);
+  }
+  client.println("OK");
+}
+
+// HANDLE COMMAND (une commande complète, sans le '.')
+void handleCommand(const char* cmd, int len) {
+  if (len == 0) {
+    // Commande vide: test de connexion
+  }
+  else if (cmd[0] == 'l') { // send LOGS ("l<position>", "l" = tout le fichier)
+    send_logs(len > 1 ? strtoul(cmd + 1, NULL, 10) : logBase);
+  }
+  else if (cmd[0] == 'r') { // remove LOGS
+    remove_logs();
+  }
+  else if (cmd[0] == 'a') { // open ALL
+    for (int i = 0; i < NB_CASIERS; i++) {
+      if (tags[i] != 0) { // Ouvrir seulement si un badge est assigné
+        open_door(i);
+      }
+    }
+  }
+  else if (cmd[0] == 'c') { // load CASIERS
+    load_casiers(cmd + 1, len - 1);
+  }
+  else if (cmd[0] == 'o') { // OPEN casier
+    open_door(atoi(cmd + 1));
+  }
+  else if (cmd[0] == 'p') { // PUSH: "p<port>" abonne le client, "p0" désabonne
+    pushPort = (unsigned int)atoi(cmd + 1);
+    pushIP = client.remoteIP();
+  }
+  client.println("OK");
+}
+
+// READ WIFI MESSAGE
+// La session reste ouverte: plusieurs commandes terminées par '.' peuvent
+// se suivre sur la même connexion. Une commande est traitée par tour de
+// loop() pour ne pas bloquer le lecteur RFID.
+void readClient() {
+  WiFiClient incoming = server.available();
+  if (incoming && incoming != client) {
+    // Un nouveau client remplace la session courante (ex: session orpheline)
+    if (client)
+      client.stop();
+    client = incoming;
+    cmdLength = 0;
+    lastClientActivity = millis();
+    Serial.println("new client");
+  }
+
+  if (!client)
+    return;
+
+  if (!client.connected() || millis() - lastClientActivity > CLIENT_IDLE_TIMEOUT) {
     client.stop();
+    cmdLength = 0;
     Serial.println("client disconnected");
+    return;
+  }
+
+  while (client.available()) {
+    char c = client.read();
+    lastClientActivity = millis();
+    if (c == 'B' && cmdLength == 0) {
+      receive_casiers_frame();
+      break;
+    }
+    else if (c == '.') {
+      cmdBuffer[cmdLength] = '\0';
+      handleCommand(cmdBuffer, cmdLength);
+      cmdLength = 0;
+      break;
+    }
+    else if (c != '\r' && c != '\n' && cmdLength < CMD_BUFFER_SIZE - 1) {
+      cmdBuffer[cmdLength++] = c;
+    }
   }
 }
 
@@ -340,10 +589,6 @@ void loop() {
     }
   }
 
-  client = server.available();
-
-  if (client) {
-    readClient();
-  }
+  readClient();
 }
 